@@ -1,32 +1,58 @@
 import os
-import whisper
-import torch
 import time
-import shutil
-import tiktoken
-from fastapi import FastAPI, UploadFile, File, Form
-from fastapi.responses import FileResponse, StreamingResponse
+import asyncio
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
-from moviepy.video.io.VideoFileClip import VideoFileClip
 from langchain_openai import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
-from fpdf import FPDF
-from pydub import AudioSegment
 from dotenv import load_dotenv
 from datetime import datetime
 from logger import logger
 from logger import handle_system_error
-from metrics import  log_evaluation_metrics
+from metrics import evaluator, evaluation_store
+import model_registry
+import parallel_asr
+from jobs import JobManager, QUEUED, RUNNING
+from workspace import sweep_stale_workspaces
+from ingest import ingest_upload, UploadTooLarge, UploadError, MAX_UPLOAD_BYTES
+from resumable import UploadSessionStore, ChunkConflict
+from progress import ProgressTracker, format_sse
+import telemetry
+import profiling
+import pdf_render
+from pdf_render import render_pdf
+from mom_document import MoMDocument, SECTION_TITLES
+from mom_store import MoMStore, FORMATS, InvalidStyle, validate_style, download_name, download_url, profile_url
+from downloads import serve_file
+from disk_cache import DiskLRUCache, make_key
+from audio_decode import decode_audio, audio_sha256, SAMPLE_RATE, VIDEO_EXTENSIONS, AUDIO_EXTENSIONS
+from chunking import split_text_into_chunks, count_tokens, StreamingChunker
 app = FastAPI()
+job_manager = JobManager()
+active_streams = 0
+
+# ✅ Capacity gauges, read at scrape time
+telemetry.Gauge("momify_jobs_queued", "Background jobs waiting for a worker process.",
+                lambda: [({}, job_manager.counts()[QUEUED])])
+telemetry.Gauge("momify_jobs_in_flight", "Pipelines running, by source.",
+                lambda: [({"source": "jobs"}, job_manager.counts()[RUNNING]), ({"source": "stream"}, active_streams)],
+                ["source"])
+upload_sessions = UploadSessionStore()
+mom_store = MoMStore()
 
 # Custom Middleware to increase request size
 class LimitUploadSizeMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         if request.method == "POST":
+            # ✅ Early reject on the declared size; ingest_upload enforces the limit on received bytes
             content_length = request.headers.get("content-length")
-            max_size = 1_000_000_000  # 1GB limit
+            max_size = MAX_UPLOAD_BYTES
 
             if content_length and int(content_length) > max_size:
                 return Response("❌ File too large! Max 1GB allowed.", status_code=413)
@@ -45,6 +71,49 @@ OUTPUT_DIR = "outputs"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# ✅ Transcripts keyed by decoded audio + model + decoding options, bounded on disk
+TRANSCRIPT_CACHE_MB = int(os.getenv("MOMIFY_TRANSCRIPT_CACHE_MB", "512"))
+transcript_cache = DiskLRUCache("transcripts", TRANSCRIPT_CACHE_MB * 1024 * 1024)
+
+# ✅ Transcript chunking: token budget per map prompt and tokens repeated between chunks
+CHUNK_MAX_TOKENS = int(os.getenv("MOMIFY_CHUNK_MAX_TOKENS", "7500"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("MOMIFY_CHUNK_OVERLAP_TOKENS", "0"))
+
+# ✅ Token budget for the summaries combined by one merge prompt (leaves room for instructions and output)
+MERGE_MAX_TOKENS = int(os.getenv("MOMIFY_MERGE_MAX_TOKENS", "5000"))
+
+# ✅ Maximum chunk summaries requested from the LLM at the same time
+MAP_CONCURRENCY = int(os.getenv("MOMIFY_MAP_CONCURRENCY", "4"))
+
+# ✅ Language the shared map phase summarizes in when one job produces MoMs in several languages
+MAP_PIVOT_LANGUAGE = os.getenv("MOMIFY_MAP_PIVOT_LANGUAGE", "en")
+
+# ✅ "serial" runs Whisper on the whole file; "parallel" splits CPU jobs at silences across processes
+TRANSCRIBE_MODE = os.getenv("MOMIFY_TRANSCRIBE_MODE", "serial")
+
+# ✅ "1" overlaps transcription with the map phase: chunk summaries start while Whisper is still running
+STREAMING_PIPELINE = os.getenv("MOMIFY_STREAMING_PIPELINE", "0") == "1"
+
+# ✅ LLM responses keyed by model, temperature, language and exact messages
+SUMMARY_CACHE_MB = int(os.getenv("MOMIFY_SUMMARY_CACHE_MB", "64"))
+summary_cache = DiskLRUCache("summaries", SUMMARY_CACHE_MB * 1024 * 1024)
+
+# ✅ Threads that render a pipeline's PDFs (one per language) concurrently
+STAGE_THREADS = int(os.getenv("MOMIFY_STAGE_THREADS", "4"))
+stage_executor = ThreadPoolExecutor(max_workers=STAGE_THREADS, thread_name_prefix="momify-stage")
+
+# ✅ Separate small pool for request-time file work (downloads, ETags, renders), so it never queues behind pipeline stages
+IO_THREADS = int(os.getenv("MOMIFY_IO_THREADS", "8"))
+io_executor = ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix="momify-io")
+
+async def run_io(function, *args):
+    """Runs blocking request-time file work on `io_executor` and awaits its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor, lambda: function(*args))
+
+class PipelineCancelled(Exception):
+    """Raised from a progress callback once nobody is listening; never retried."""
+
 def retry_processing(function, function_name, max_attempts=3, delay=2):
     """
     Retries executing a function up to `max_attempts` times while logging the attempts.
@@ -63,10 +132,13 @@ def retry_processing(function, function_name, max_attempts=3, delay=2):
     while attempt < max_attempts:
         try:
             logger.info(f"🔄 Attempt {attempt + 1}/{max_attempts} - Executing {function_name}()")
-            result = function()
+            with profiling.span(function_name, attempt=attempt + 1):
+                result = function()
             logger.info(f"✅ {function_name}() executed successfully on attempt {attempt + 1}")
             return result
 
+        except PipelineCancelled:
+            raise
         except Exception as e:
             attempt += 1
             logger.error(f"⚠️ Attempt {attempt} failed for {function_name}: {e}")
@@ -79,161 +151,271 @@ def retry_processing(function, function_name, max_attempts=3, delay=2):
     raise RuntimeError(f"❌ Maximum retry attempts reached. {function_name}() failed.")
 
 # ✅ Function to Send Progress Updates to UI
-async def progress_generator(file_path, font="Arial", color="000000", language="en"):
-    print(f"✅ [progress_generator] Received language: {language}")
-
-    yield "⏳ Upload successful. Starting processing...\n"
-    time.sleep(1)
-
-    start_time = time.time()
-
-    yield "🔄 Extracting audio...\n"
-    audio_path = extract_audio(file_path)
-    time.sleep(1)
-
-    yield "📝 Transcribing audio...\n"
-    transcription = transcribe_audio_with_retry(audio_path)
-    time.sleep(1)
+async def progress_generator(file_path, font="Arial", color="000000", language="en", workspace=None, profile=None):
+    """
+    Runs the pipeline for one upload and yields its typed progress events as they happen.
 
-    yield "📑 Summarizing transcript...\n"
-    summary = summarize_text_with_retry(transcription, language)
-    end_time = time.time()
-    log_evaluation_metrics(summary, start_time, end_time)
-    time.sleep(1)
+    `run_pipeline` runs on its own thread and its events are handed to the event loop; the last event is
+    `complete` (with one PDF per requested language) or `error`. Closing the generator stops the pipeline
+    at its next progress event. With `profile` (`"spans"` or `"sampled"`) the run is traced and `complete`
+    links the profile.
+    """
+    global active_streams
+    languages = parse_languages(language)
 
-    yield "📄 Generating PDF...\n"
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    closed = threading.Event()
+    progress = ProgressTracker(lambda event: None)  # ✅ Follows the pipeline's stages to build the final event
 
-    filename =  export_pdf_with_retry(summary, f"Meeting_Minutes_{timestamp}.pdf", font, color, language)
-    time.sleep(1)
+    def emit(event):
+        if closed.is_set():
+            raise PipelineCancelled("❌ Client disconnected, pipeline stopped.")
+        loop.call_soon_threadsafe(events.put_nowait, event)
 
-    yield f"✅ Processing complete! Download: /download/{filename}\n"
-    yield f"FILENAME::{filename}\n"
+    # ✅ A thread of its own, not a stage thread: the pipeline itself hands PDF renders to `stage_executor`
+    active_streams += 1
+    task = loop.run_in_executor(None, partial(run_pipeline, file_path, font, color, languages, emit, workspace, profile))
 
-### **🔹 Token Counting & Chunk Splitting (For Large Transcripts)**
-def count_tokens(text, model="gpt-4"):
-    """Returns the number of tokens in a string using OpenAI's tokenizer."""
-    enc = tiktoken.encoding_for_model(model)
-    return len(enc.encode(text))
+    def finished(future):
+        future.exception()  # ✅ Marks the error as seen; a run stopped after a disconnect has nobody to report to
+        events.put_nowait(None)
 
+    task.add_done_callback(finished)
 
-def split_text_into_chunks(text, max_tokens=7500):
-    """Splits long text into smaller chunks while preserving sentence structure."""
-    words = text.split()
-    chunks = []
-    current_chunk = []
-    current_token_count = 0
+    try:
+        while (event := await events.get()) is not None:
+            if event["type"] == "stage":
+                progress.stage(event["stage"], event["message"])
+            yield event
+        files = await task
+    except Exception as e:
+        yield progress.error(str(e))
+        return
+    finally:
+        closed.set()
+        active_streams -= 1
+
+    filename = files[languages[0]]
+    job_id = workspace.token if workspace else None
+    downloads = {lang: download_url(job_id, lang) if job_id else f"/download/{name}" for lang, name in files.items()}
+    extra = {"profile_url": profile_url(job_id)} if profile and job_id else {}
+    yield progress.complete(message=f"✅ Processing complete! Download: {downloads[languages[0]]}", filename=filename,
+                            download_url=downloads[languages[0]], files=files, downloads=downloads, job_id=job_id, **extra)
+
+def run_pipeline(file_path, font="Arial", color="000000", language="en", emit=None, workspace=None, profile=None):
+    """
+    Runs extract → transcribe → summarize → PDF for one file in the calling process.
 
-    for word in words:
-        word_token_count = count_tokens(word)
-        if current_token_count + word_token_count > max_tokens:
-            chunks.append(" ".join(current_chunk))
-            current_chunk = []
-            current_token_count = 0
-        current_chunk.append(word)
-        current_token_count += word_token_count
+    Args:
+        file_path (str): The uploaded audio or video file.
+        font (str): PDF font.
+        color (str): HEX color for headers.
+        language (str | list[str]): MoM language code, or several codes for one PDF each.
+        emit (callable): Optional `emit(event)` callback receiving the typed progress events.
+        workspace (JobWorkspace): Optional per-job directory for intermediate files, removed afterwards.
+        profile (str): `"spans"` or `"sampled"` to write a trace of the run next to its outputs.
 
-    if current_chunk:
-        chunks.append(" ".join(current_chunk))
+    Returns:
+        dict: The generated PDF filename (inside `OUTPUT_DIR`) for each language, in request order.
+    """
+    languages = parse_languages(language)
+    progress = ProgressTracker(emit or (lambda event: None))
+    start_time = time.time()
+    job_tag = workspace.token if workspace else None
 
-    return chunks
+    with telemetry.pipeline_timer(), profiling.job_profile(job_tag, profile, partial(mom_store.profile_path, job_tag)):
+        try:
+            progress.stage("extract", "🔄 Extracting audio...")
+            audio = extract_audio(file_path)
 
+            progress.stage("transcribe", "📝 Transcribing audio...")
+            if STREAMING_PIPELINE:
+                transcription, chunk_summaries = transcribe_and_map_with_retry(audio, map_language(languages), progress)
+            else:
+                transcription = transcribe_audio_with_retry(audio, progress)
 
-### **🔹 Extract Audio from Video & Convert Audio Formats**
+            progress.stage("summarize", "📑 Summarizing transcript...")
+            if STREAMING_PIPELINE:
+                summaries = merge_summaries_with_retry(chunk_summaries, languages)
+            else:
+                summaries = summarize_text_with_retry(transcription, languages, progress)
+            end_time = time.time()
+            documents = store_documents(summaries, job_tag, font, color)
+            submit_evaluations(documents, job_tag, end_time - start_time)
+
+            progress.stage("pdf", "📄 Generating PDF...")
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filenames = stage_executor.map(
+                profiling.propagate(lambda lang: export_pdf_with_retry(documents[lang], f"Meeting_Minutes_{timestamp}.pdf", font, color, lang, job_tag)),
+                languages
+            )
+            files = dict(zip(languages, filenames))
+        finally:
+            if workspace:
+                workspace.cleanup()
+
+    return files
+
+### **🔹 Decode Audio from Video & Audio Files (16 kHz mono, in memory)**
 def extract_audio(file_path):
     file_extension = os.path.splitext(file_path)[1].lower()
-    audio_path = os.path.join(UPLOAD_DIR, "extracted_audio.wav")
-
-    print(f"\nProcessing file: {file_path} (Type: {file_extension})")
 
     logger.info(f"🔍 Processing file: {file_path} (Type: {file_extension})")
 
     try:
-        if file_extension in [".mp4", ".mov", ".avi", ".mkv", ".webm"]:
-            logger.info("🎥 Detected video file. Extracting audio...")
-            print("🎥 Detected video file. Extracting audio...")
-            video = VideoFileClip(file_path)
-
-            if not video.audio:
-                raise ValueError("❌ No audio found in the video file!")
-
-            video.audio.write_audiofile(audio_path, codec="pcm_s16le")
-
-        elif file_extension in [".wav", ".mp3", ".m4a", ".wma", ".aac", ".flac", ".ogg"]:
-            logger.info("🎵 Detected audio file. Converting to WAV...")
-            print("🎵 Detected audio file. Converting to WAV...")
-            audio = AudioSegment.from_file(file_path)
-            audio.export(audio_path, format="wav")
-
+        if file_extension in VIDEO_EXTENSIONS:
+            logger.info("🎥 Detected video file. Decoding audio stream...")
+        elif file_extension in AUDIO_EXTENSIONS:
+            logger.info("🎵 Detected audio file. Decoding audio...")
         else:
             raise ValueError(f"❌ Unsupported file format: {file_extension}")
 
-        print(f"✅ Audio saved to {audio_path}")
-        logger.info(f"✅ Audio saved to {audio_path}")
-        return audio_path
+        with telemetry.stage_timer("decode"):
+            audio = decode_audio(file_path)
+        if audio.size == 0:
+            raise ValueError("❌ No audio found in the file!")
+        return audio
     except Exception as e:
         logger.error(f"❌ Error extracting audio from {file_path}: {e}")
         handle_system_error(str(e))
         raise
 
-def transcribe_audio_with_retry(audio_path):
-    return retry_processing(lambda: transcribe_audio(audio_path), "transcribe_audio", max_attempts=3, delay=5)
+def transcribe_audio_with_retry(audio, progress=None):
+    return retry_processing(lambda: transcribe_audio(audio, progress=progress), "transcribe_audio", max_attempts=3, delay=5)
 
-def summarize_text_with_retry(transcription, language="en"):
-    return retry_processing(lambda: summarize_text(transcription, language), "summarize_text", max_attempts=3, delay=3)
+def summarize_text_with_retry(transcription, languages=("en",), progress=None):
+    return retry_processing(lambda: summarize_text(transcription, languages, progress), "summarize_text", max_attempts=3, delay=3)
 
-def export_pdf_with_retry(summary, filename, font, color, language):
-    return retry_processing(lambda: export_to_pdf(summary, filename, font, color, language), "export_to_pdf", max_attempts=3, delay=2)
+def export_pdf_with_retry(document, filename, font, color, language, job_tag=None):
+    return retry_processing(lambda: export_to_pdf(document, filename, font, color, language, job_tag), "export_to_pdf", max_attempts=3, delay=2)
+
+def transcribe_and_map_with_retry(audio, language="en", progress=None):
+    return retry_processing(lambda: transcribe_and_map(audio, language, progress), "transcribe_and_map", max_attempts=3, delay=5)
+
+def merge_summaries_with_retry(summaries, languages=("en",)):
+    return retry_processing(lambda: merge_summaries(summaries, languages), "merge_summaries", max_attempts=3, delay=3)
 
 ### **🔹 Transcribe Audio with Whisper (Using GPU if Available)**
-def transcribe_audio(audio_path):
-    if not torch.cuda.is_available():
-        print("⚠️ Warning: No GPU detected, running on CPU. This will be slower!")
-        logger.warning("⚠️ No GPU detected, running on CPU. This may be slower.")
+def transcript_cache_key(audio, model_size, decode_options, mode):
+    """Keys a transcript by decoded audio, model, decoding options and mode ("serial" or VAD-segmented "vad")."""
+    return make_key(audio_sha256(audio), model_size, decode_options, mode)
+
+def transcribe_audio(audio, model_size=None, progress=None, **decode_options):
+    model_size = model_size or model_registry.DEFAULT_MODEL_SIZE
+    on_progress = progress.audio if progress else None
+    parallel = TRANSCRIBE_MODE == "parallel" and model_registry.default_device() == "cpu"
+
+    # ✅ Same decoded audio + model + options → reuse the earlier transcript
+    cache_key = transcript_cache_key(audio, model_size, decode_options, "vad" if parallel else "serial")
+    cached = transcript_cache.get(cache_key)
+    if cached is not None:
+        logger.info("✅ Transcript served from cache, skipping Whisper.")
+        if progress:
+            progress.audio(len(audio) / SAMPLE_RATE, len(audio) / SAMPLE_RATE)
+        return cached["text"]
 
-    print("\nLoading Whisper model...")
-    model = whisper.load_model("medium").to("cuda" if torch.cuda.is_available() else "cpu")
+    loaded_model = model_registry.get_model(model_size)
 
-    print(f"✅ Model is running on: {'cuda' if torch.cuda.is_available() else 'cpu'}")
-    logger.info(f"✅ Model is running on: {'cuda' if torch.cuda.is_available() else 'cpu'}")
+    logger.info(f"✅ Whisper '{loaded_model.size}' model is running on: {loaded_model.device}")
 
     try:
-        result = model.transcribe(audio_path)
+        start = time.perf_counter()
+        with telemetry.stage_timer("transcribe"):
+            if parallel:
+                result = parallel_asr.transcribe_parallel(loaded_model, audio, on_progress=on_progress, **decode_options)
+            else:
+                with loaded_model as model, parallel_asr.whisper_progress(on_progress):
+                    result = model.transcribe(audio, **decode_options)
+        telemetry.observe_transcription(model_size, len(audio) / SAMPLE_RATE, time.perf_counter() - start)
         logger.info("✅ Transcription completed successfully.")
-        return result["text"]
     except Exception as e:
         logger.error(f"❌ Error during transcription: {e}")
         handle_system_error(str(e))
         raise
 
+    transcript_cache.put(cache_key, {"text": result["text"], "model": model_size, "options": decode_options})
+    return result["text"]
+
 ### **🔹 Summarize Transcription into MoM Format**
-def summarize_text(transcription, language="en"):
-    print("\nGenerating Minutes of Meeting...")
-
-    transcript_chunks = split_text_into_chunks(transcription)
-    print(f"📌 Transcript split into {len(transcript_chunks)} chunks.")
-
-    llm = ChatOpenAI(model_name="gpt-4", temperature=0, openai_api_key=OPENAI_API_KEY)
-
-    summarized_chunks = []
-
-    for i, chunk in enumerate(transcript_chunks):
-        print(f"\n📌 Summarizing Chunk {i + 1}/{len(transcript_chunks)}...")
-        messages = [
-            SystemMessage(
-                content=f"You are an AI that converts meeting transcripts into structured Minutes of Meeting (MoM). "
-                        f"Make the summary **professional yet easy to read**. "
-                        f"- Keep all key details intact. "
-                        f"- Break long sentences into two shorter ones for better readability. "
-                        f"- Avoid technical words when simpler ones can be used. "
-                        f"- Ensure smooth transitions between points."
-                        f"- Use proper business language (not casual)."
-                        f"Generate the MoM **entirely in {language}**. Do not mix languages."
-                        f"Do NOT add numbers before section headers."
-                        f"Use only the exact section headers from the list below. Do NOT change them."
-            ),
-            HumanMessage(content=
-                         f"""Summarize this part of a meeting transcript **in {language}**:
+async def ainvoke_llm_cached(llm, messages, language, phase="map"):
+    """Returns the LLM reply text for `messages`, reusing a cached reply for an identical prompt."""
+    cache_key = make_key(llm.model_name, llm.temperature, language,
+                         [(message.type, message.content) for message in messages])
+    cached = summary_cache.get(cache_key)
+    if cached is not None:
+        telemetry.LLM_REQUESTS.inc(phase=phase, cached="true")
+        return cached["content"]
+
+    with profiling.span(f"llm_{phase}", language=language):
+        reply = await llm.ainvoke(messages)
+    summary_cache.put(cache_key, {"content": reply.content})
+    observe_llm_usage(reply, messages, phase)
+    return reply.content
+
+def observe_llm_usage(reply, messages, phase):
+    """Records the request's prompt and completion tokens, as reported by the API or counted locally."""
+    usage = (getattr(reply, "response_metadata", None) or {}).get("token_usage") or {}
+    prompt_tokens = usage.get("prompt_tokens") or sum(count_tokens(message.content) for message in messages)
+    completion_tokens = usage.get("completion_tokens") or count_tokens(reply.content)
+    telemetry.LLM_REQUESTS.inc(phase=phase, cached="false")
+    telemetry.LLM_TOKENS.observe(prompt_tokens, phase=phase, kind="prompt")
+    telemetry.LLM_TOKENS.observe(completion_tokens, phase=phase, kind="completion")
+
+# ✅ Merge-prompt headers, derived from the section titles the MoM parser recognises
+SECTION_HEADERS = {language: [f"**{title}**" for title in titles] for language, titles in SECTION_TITLES.items()}
+
+DATE_NOT_MENTIONED = {
+    "en": "Not mentioned",
+    "id": "Tidak disebutkan",
+    "ms": "Tidak dinyatakan",
+    "tl": "Hindi nabanggit"
+}
+
+def parse_languages(value):
+    """
+    Normalizes the `language` option: a code, a comma-separated string or a list of codes.
+
+    Returns:
+        list[str]: Unique language codes in request order.
+
+    Raises:
+        ValueError: When no language or an unsupported one is requested.
+    """
+    if isinstance(value, str):
+        value = value.split(",")
+    languages = list(dict.fromkeys(code.strip() for code in value if code.strip()))
+
+    unsupported = [code for code in languages if code not in SECTION_HEADERS]
+    if not languages or unsupported:
+        raise ValueError(f"❌ Unsupported language(s): {', '.join(unsupported) or 'none given'}. "
+                         f"Choose from {', '.join(SECTION_HEADERS)}.")
+    return languages
+
+def map_language(languages):
+    """
+    Language of the chunk summaries. A single-language job maps straight into its language;
+    a multi-language job maps once into `MAP_PIVOT_LANGUAGE` and each merge writes its own language.
+    """
+    return languages[0] if len(languages) == 1 else MAP_PIVOT_LANGUAGE
+
+def build_chunk_messages(chunk, language):
+    """Builds the map-phase prompt that summarizes one transcript chunk."""
+    return [
+        SystemMessage(
+            content=f"You are an AI that converts meeting transcripts into structured Minutes of Meeting (MoM). "
+                    f"Make the summary **professional yet easy to read**. "
+                    f"- Keep all key details intact. "
+                    f"- Break long sentences into two shorter ones for better readability. "
+                    f"- Avoid technical words when simpler ones can be used. "
+                    f"- Ensure smooth transitions between points."
+                    f"- Use proper business language (not casual)."
+                    f"Generate the MoM **entirely in {language}**. Do not mix languages."
+                    f"Do NOT add numbers before section headers."
+                    f"Use only the exact section headers from the list below. Do NOT change them."
+        ),
+        HumanMessage(content=
+                     f"""Summarize this part of a meeting transcript **in {language}**:
 
                                     1️⃣ **Agenda:** Extract the main topics discussed. **Format them as bullet points (`-`).**
                                     2️⃣ **Attendees:** List all attendees using bullet points (`-`). If roles are mentioned, include them in parentheses.
@@ -244,45 +426,14 @@ def summarize_text(transcription, language="en"):
                                      Transcript:  
                                      {chunk}
                                      """
-                         )
-        ]
-        summary = llm.invoke(messages)
-        summarized_chunks.append(summary.content)
-
-        section_headers = {
-            "en": [
-                "**Meeting Title:**", "**Date & Time:**", "**Attendees:**",
-                "**Agenda:**", "**Discussion Points:**", "**Action Items:**",
-                "**Conclusion:**", "**Next Meeting Date:**"
-            ],
-            "id": [
-                "**Judul Rapat:**", "**Tanggal & Waktu:**", "**Peserta:**",
-                "**Agenda:**", "**Poin Diskusi:**", "**Tindakan:**",
-                "**Kesimpulan:**", "**Tanggal Rapat Berikutnya:**"
-            ],
-            "ms": [
-                "**Tajuk Mesyuarat:**", "**Tarikh & Masa:**", "**Peserta:**",
-                "**Agenda:**", "**Perkara Dibincangkan:**", "**Tindakan:**",
-                "**Kesimpulan:**", "**Tarikh Mesyuarat Seterusnya:**"
-            ],
-            "tl": [
-                "**Pamagat ng Pulong:**", "**Petsa at Oras:**", "**Mga Dumalo:**",
-                "**Adyenda:**", "**Mga Punto ng Talakayan:**", "**Mga Hakbang na Dapat Gawin:**",
-                "**Konklusyon:**", "**Susunod na Petsa ng Pagpupulong:**"
-            ]
-        }
-
-    date_not_mentioned = {
-        "en": "Not mentioned",
-        "id": "Tidak disebutkan",
-        "ms": "Tidak dinyatakan",
-        "tl": "Hindi nabanggit"
-    }
-
-    headers = section_headers.get(language, section_headers["en"])
-
-    print("\n📌 Merging summarized chunks into final MoM...")
-    messages = [
+                     )
+    ]
+
+def build_merge_messages(summaries, language):
+    """Builds the reduce-phase prompt that merges chunk summaries into one MoM."""
+    headers = SECTION_HEADERS.get(language, SECTION_HEADERS["en"])
+
+    return [
         SystemMessage(
             content=f"""You are an AI that converts meeting transcripts into structured Minutes of Meeting (MoM).
             - Generate the MoM **entirely in {language}**. Do not mix languages.
@@ -292,165 +443,269 @@ def summarize_text(transcription, language="en"):
             - Leave **one empty line** between each section.
             """),
         HumanMessage(
-            content="Combine these meeting summaries into a structured MoM:\n\n" + "\n\n".join(summarized_chunks) +
+            content="Combine these meeting summaries into a structured MoM:\n\n" + "\n\n".join(summaries) +
                     "\n\nFormat it with these section headers WITHOUT numbering:\n"
                     + "\n".join(headers) +
                     "\n\nRules:\n"
-                    f"- If '{headers[1]}' (Date & Time) is missing, write **{date_not_mentioned[language]}**.\n"
-                    f"- If '{headers[-1]}' (Next Meeting Date) is missing, write **{date_not_mentioned[language]}**.\n"
+                    f"- If '{headers[1]}' (Date & Time) is missing, write **{DATE_NOT_MENTIONED[language]}**.\n"
+                    f"- If '{headers[-1]}' (Next Meeting Date) is missing, write **{DATE_NOT_MENTIONED[language]}**.\n"
                     "- **Use bullet points (`-`) for Attendees, Agenda, and Action Items.**\n"
                     "- Ensure professional formatting and consistent spacing."
         )
     ]
-    final_summary = llm.invoke(messages)
 
-    return final_summary.content
+async def summarize_chunk(llm, chunk, language, semaphore, label):
+    """Summarizes one transcript chunk once a slot in `semaphore` is free, logging its latency."""
+    async with semaphore:
+        start = time.perf_counter()
+        content = await ainvoke_llm_cached(llm, build_chunk_messages(chunk, language), language)
+        logger.info(f"📌 Chunk {label} summarized in {time.perf_counter() - start:.1f}s")
+        return content
 
-class PDFWithFooter(FPDF):
-    def footer(self):
-        self.set_y(-15)  # Position footer 15mm from the bottom
-        self.set_font("Arial", "I", 10)
-        self.set_text_color(150, 150, 150)  # Light gray text
+async def summarize_chunks(llm, transcript_chunks, language, concurrency=None, progress=None):
+    """
+    Runs the map phase: summarizes every chunk concurrently through the async LLM API.
 
-        # Format timestamp in a human-readable format
-        timestamp = datetime.now().strftime("%B %d, %Y at %I:%M %p")
-        footer_text = f"Generated by MoMify | {timestamp}"
+    Args:
+        llm (ChatOpenAI): The chat model.
+        transcript_chunks (list[str]): Transcript chunks in order.
+        language (str): MoM language code.
+        concurrency (int): Maximum in-flight LLM requests (defaults to `MAP_CONCURRENCY`).
+        progress (ProgressTracker): Optional tracker notified as each chunk finishes.
+
+    Returns:
+        list[str]: Chunk summaries in the same order as `transcript_chunks`.
+    """
+    semaphore = asyncio.Semaphore(concurrency or MAP_CONCURRENCY)
+    total = len(transcript_chunks)
 
-        # Logo settings
-        logo_path = "assets/logo.png"
-        logo_width = 6  # Adjust for better alignment
-        logo_height = 6  # Adjust for better alignment
+    async def summarize(index, chunk):
+        summary = await summarize_chunk(llm, chunk, language, semaphore, f"{index}/{total}")
+        if progress:
+            progress.chunk(index, total)
+        return summary
 
+    return await asyncio.gather(*(summarize(i + 1, chunk) for i, chunk in enumerate(transcript_chunks)))
+
+def group_by_token_budget(summaries, max_tokens):
+    """
+    Packs consecutive summaries into groups of at most `max_tokens` tokens.
+
+    A group is only closed once it holds two summaries, so every merge round shrinks
+    the list even when single summaries are larger than the budget.
+    """
+    groups = []
+    current = []
+    current_tokens = 0
+
+    for summary in summaries:
+        tokens = count_tokens(summary)
+        if len(current) >= 2 and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current = []
+            current_tokens = 0
+        current.append(summary)
+        current_tokens += tokens
+
+    if current:
+        groups.append(current)
+    return groups
+
+async def reduce_summaries(llm, summaries, language, max_tokens=None, concurrency=None):
+    """
+    Runs the reduce phase as a tree: merges groups of summaries in parallel, level by level,
+    until they fit into one final merge prompt.
+
+    Args:
+        llm (ChatOpenAI): The chat model.
+        summaries (list[str]): Chunk summaries in transcript order.
+        language (str): MoM language code.
+        max_tokens (int): Token budget per merge prompt (defaults to `MERGE_MAX_TOKENS`).
+        concurrency (int): Maximum in-flight merges per level (defaults to `MAP_CONCURRENCY`).
+
+    Returns:
+        str: The final MoM.
+    """
+    max_tokens = max_tokens or MERGE_MAX_TOKENS
+    semaphore = asyncio.Semaphore(concurrency or MAP_CONCURRENCY)
+    level = 0
+
+    async def merge_group(group):
+        if len(group) == 1:
+            return group[0]
+        async with semaphore:
+            return await ainvoke_llm_cached(llm, build_merge_messages(group, language), language, "reduce")
+
+    groups = group_by_token_budget(summaries, max_tokens)
+    while len(groups) > 1:
+        level += 1
+        start = time.perf_counter()
+        summaries = await asyncio.gather(*(merge_group(group) for group in groups))
+        logger.info(f"📌 Reduce level {level}: {len(groups)} group(s) merged in {time.perf_counter() - start:.1f}s")
+        groups = group_by_token_budget(summaries, max_tokens)
+
+    return await ainvoke_llm_cached(llm, build_merge_messages(summaries, language), language, "reduce")
+
+async def reduce_languages(llm, summaries, languages):
+    """Merges the same chunk summaries into one MoM per language, concurrently."""
+    with telemetry.stage_timer("reduce"):
+        moms = await asyncio.gather(*(reduce_summaries(llm, summaries, language) for language in languages))
+    return dict(zip(languages, moms))
+
+async def map_reduce_summaries(llm, transcript_chunks, languages, progress=None):
+    """Summarizes every chunk once, then merges the summaries into the final MoM for each language."""
+    map_start = time.perf_counter()
+    with telemetry.stage_timer("map"):
+        summarized_chunks = await summarize_chunks(llm, transcript_chunks, map_language(languages), progress=progress)
+    logger.info(f"📌 Map phase: {len(transcript_chunks)} chunk(s) in {time.perf_counter() - map_start:.1f}s")
+
+    logger.info("📌 Merging summarized chunks into final MoM...")
+    return await reduce_languages(llm, summarized_chunks, languages)
+
+def create_llm():
+    return ChatOpenAI(model_name="gpt-4", temperature=0, openai_api_key=OPENAI_API_KEY)
+
+def summarize_text(transcription, languages=("en",), progress=None):
+    logger.info("📝 Generating Minutes of Meeting...")
+
+    with telemetry.stage_timer("chunk"):
+        transcript_chunks = split_text_into_chunks(transcription, CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS)
+    logger.info(f"📌 Transcript split into {len(transcript_chunks)} chunks.")
+
+    return asyncio.run(map_reduce_summaries(create_llm(), transcript_chunks, languages, progress))
+
+async def transcribe_and_map_async(audio, language="en", model_size=None, progress=None, **decode_options):
+    """
+    Transcribes VAD segment by segment and sends each chunk's map-phase summary request as soon
+    as its token budget fills, so Whisper and GPT-4 latency overlap instead of adding up.
+
+    Args:
+        audio (np.ndarray): Decoded 16 kHz mono audio.
+        language (str): MoM language code.
+        model_size (str): Whisper model size (defaults to the registry default).
+        progress (ProgressTracker): Optional tracker fed with audio seconds decoded and chunks summarized.
+        **decode_options: Options forwarded to Whisper.
+
+    Returns:
+        tuple: (transcription, chunk summaries in transcript order).
+    """
+    model_size = model_size or model_registry.DEFAULT_MODEL_SIZE
+    llm = create_llm()
+    semaphore = asyncio.Semaphore(MAP_CONCURRENCY)
+    loop = asyncio.get_running_loop()
+
+    cache_key = await loop.run_in_executor(None, transcript_cache_key, audio, model_size, decode_options, "vad")
+    cached = transcript_cache.get(cache_key)
+    if cached is not None:
+        logger.info("✅ Transcript served from cache, skipping Whisper.")
+        with telemetry.stage_timer("chunk"):
+            transcript_chunks = split_text_into_chunks(cached["text"], CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS)
+        with telemetry.stage_timer("map"):
+            return cached["text"], await summarize_chunks(llm, transcript_chunks, language, progress=progress)
+
+    loaded_model = await loop.run_in_executor(None, model_registry.get_model, model_size)
+    parallel = TRANSCRIBE_MODE == "parallel" and loaded_model.device == "cpu"
+    segments = asyncio.Queue()
+    on_progress = progress.audio if progress else None
+
+    async def summarize_streamed(chunk, index):
+        summary = await summarize_chunk(llm, chunk, language, semaphore, f"{index} (streaming)")
+        if progress:
+            progress.chunk(index)
+        return summary
+
+    def transcribe_segments():
+        # ✅ Runs on a worker thread; hands each segment's text to the event loop as soon as it is ready
         try:
-            # Get page width for centering
-            page_width = self.w
-            text_width = self.get_string_width(footer_text)
-            total_width = text_width + logo_width + 5  # Space between logo and text
-
-            # Calculate X position for centering
-            x_position = (page_width - total_width) / 2
-            y_position = self.get_y() + 1  # Adjust text baseline
-
-            # Print debug info
-            print(f"📌 Footer Debug Info:")
-            print(f"   - Page Width: {page_width}")
-            print(f"   - Text Width: {text_width}")
-            print(f"   - Logo Width: {logo_width}")
-            print(f"   - Total Width: {total_width}")
-            print(f"   - X Position: {x_position}")
-            print(f"   - Y Position (before): {self.get_y()}")
-            print(f"   - Y Position (after adj.): {y_position}")
-
-            # Place logo
-            self.image(logo_path, x=x_position, y=y_position - 1, w=logo_width, h=logo_height)
-
-            # Place text
-            self.set_xy(x_position + logo_width + 3, y_position)  # Fine-tune text positioning
-            self.cell(0, 6, footer_text, align="L")
+            for text in parallel_asr.iter_transcribe(loaded_model, audio, parallel, on_progress=on_progress,
+                                                     **decode_options):
+                loop.call_soon_threadsafe(segments.put_nowait, text)
+        finally:
+            loop.call_soon_threadsafe(segments.put_nowait, None)
+
+    transcribe_start = time.perf_counter()
+    transcriber = loop.run_in_executor(None, profiling.propagate(transcribe_segments))
+    chunker = StreamingChunker(CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS)
+    texts = []
+    chunk_tasks = []
+    map_start = []
+
+    def start_chunks(chunks):
+        for chunk in chunks:
+            if not map_start:
+                map_start.append(time.perf_counter())
+            chunk_tasks.append(asyncio.create_task(summarize_streamed(chunk, len(chunk_tasks) + 1)))
+
+    while (text := await segments.get()) is not None:
+        texts.append(text)
+        start_chunks(chunker.feed(text))
+
+    await transcriber  # ✅ Re-raises transcription errors
+    transcribe_seconds = time.perf_counter() - transcribe_start
+    telemetry.STAGE_SECONDS.observe(transcribe_seconds, stage="transcribe")
+    telemetry.observe_transcription(model_size, len(audio) / SAMPLE_RATE, transcribe_seconds)
+    start_chunks(chunker.flush())
+
+    transcription = " ".join(text for text in texts if text)
+    transcript_cache.put(cache_key, {"text": transcription, "model": model_size, "options": decode_options})
+    logger.info(f"✅ Transcription completed; {len(chunk_tasks)} chunk summar{'y' if len(chunk_tasks) == 1 else 'ies'} "
+                f"started while transcribing.")
+
+    summaries = await asyncio.gather(*chunk_tasks)
+    if map_start:
+        # ✅ Overlaps transcription: measured from the first chunk request to the last summary
+        telemetry.STAGE_SECONDS.observe(time.perf_counter() - map_start[0], stage="map")
+    return transcription, summaries
+
+def transcribe_and_map(audio, language="en", progress=None):
+    return asyncio.run(transcribe_and_map_async(audio, language, progress=progress))
+
+def merge_summaries(summaries, languages=("en",)):
+    return asyncio.run(reduce_languages(create_llm(), summaries, languages))
+
+### **🔹 Parse Summaries into MoM Documents**
+def store_documents(summaries, job_tag=None, font="Arial", color="000000"):
+    """
+    Parses each language's summary into a `MoMDocument` once; with a job tag the documents are
+    kept in the `MoMStore` so other formats can be exported later without another LLM call.
 
-        except Exception as e:
-            print(f"⚠️ Error in footer rendering: {e}")
-            print("⚠️ Warning: MoMify logo not found at 'assets/logo.png'!")
+    Returns:
+        dict: The parsed document for each language.
+    """
+    with profiling.span("parse_mom"):
+        documents = {lang: MoMDocument.parse(summary, lang) for lang, summary in summaries.items()}
+    if job_tag:
+        for document in documents.values():
+            mom_store.save(job_tag, document, font, color)
+    return documents
+
+def submit_evaluations(documents, job_tag, processing_seconds):
+    """Queues each language's MoM for readability scoring; the background evaluator keeps it off the critical path."""
+    for lang, document in documents.items():
+        evaluator.submit(job_tag, lang, document.plain_text(), processing_seconds)
 
 ### **🔹 Export Summary to PDF in MoM Format**
-def export_to_pdf(summary, filename="Meeting_Minutes.pdf", font="Arial", color="000000", language="en"):
+def export_to_pdf(document, filename="Meeting_Minutes.pdf", font="Arial", color="000000", language="en", job_tag=None):
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
     # Format timestamp
     formatted_date = datetime.now().strftime("%B-%d-%Y_%H-%M-%S")
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"Meeting_Minutes_{formatted_date.upper()}_{language.upper()}.pdf"
-
-    print("\nExporting summary to PDF...")
-    print("\n📜 Debug: Exporting summary to PDF...")
-    print(f"🎨 Chosen font: {font}")
-    print(f"🎨 Chosen color: {color}")
-    print(f" 🌎 Language selected: {language}")
-    print(f"📜 File name: {filename}")
-
-    # ✅ Convert color from HEX to RGB
-    r, g, b = tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
-    print(f"🎨 Converted RGB Color: {r}, {g}, {b}")
-
     pdf_path = os.path.join(OUTPUT_DIR, filename)
+    if job_tag:
+        # ✅ Job PDFs live with the job's MoM and are downloaded by job id
+        filename = download_name(job_tag, language)
+        pdf_path = mom_store.pdf_path(job_tag, language)
 
     logger.info(f"\n📜 Exporting summary to PDF: {filename}")
     logger.info(f"🎨 Chosen font: {font}, Color: {color}, Language: {language}")
 
     try:
-        pdf = PDFWithFooter()
-        pdf.set_auto_page_break(auto=True, margin=15)
-        pdf.add_page()
-
-        # ✅ Register Poppins font (if not already registered)
-        pdf.add_font("Poppins", "", "assets/fonts/Poppins-Regular.ttf", uni=True)
-        pdf.add_font("Poppins", "B", "assets/fonts/Poppins-Bold.ttf", uni=True)
-
-        pdf.set_font("Poppins", "", 12)  # Normal text
-        pdf.set_font("Poppins", "B", 14)  # Bold text
-
-        # ✅ Set Title Formatting (Always Bold and Colored)
-        pdf.set_font(font, "B", 20)
-        pdf.set_text_color(r, g, b)  # Apply user-selected color
-        pdf.cell(200, 10, "MEETING MINUTES", ln=True, align='C')
-
-        # ✅ Draw a colored line below the title
-        pdf.ln(2)  # Small space before the line
-        pdf.set_draw_color(r, g, b)  # Use the user-selected color
-        pdf.line(10, pdf.get_y(), 200, pdf.get_y())  # Draw a horizontal line across the page
-
-        pdf.ln(8)  # Space after the line before the content
-
-        # ✅ Replace **bold** markers from Markdown
-        summary = summary.replace("**", "")
-
-        # ✅ Define section headers that should be bold and colored
-        bold_headers_dict = {
-            "en": ["Meeting Title:", "Date & Time:", "Attendees:", "Agenda:",
-                   "Discussion Points:", "Action Items:", "Conclusion:", "Next Meeting Date:"],
-
-            "id": ["Judul Rapat:", "Tanggal & Waktu:", "Peserta:", "Agenda:",
-                   "Poin Diskusi:", "Tindakan:", "Kesimpulan:", "Tanggal Rapat Berikutnya:"],
-
-            "ms": ["Tajuk Mesyuarat:", "Tarikh & Masa:", "Peserta:", "Agenda:",
-                   "Perkara Dibincangkan:", "Tindakan:", "Kesimpulan:", "Tarikh Mesyuarat Seterusnya:"],
-
-            "tl": ["Pamagat ng Pulong:", "Petsa at Oras:", "Mga Dumalo:", "Adyenda:",
-                   "Mga Punto ng Talakayan:", "Mga Hakbang na Dapat Gawin:", "Konklusyon:",
-                   "Susunod na Petsa ng Pagpupulong:"]
-        }
-
-        # ✅ Debugging: Print what language was actually used
-        if language not in bold_headers_dict:
-            print(f"⚠️ Warning: Language '{language}' not found, defaulting to 'en'.")
-            language = "en"
-
-        bold_headers = bold_headers_dict[language]
-        print(f"📌 Using bold headers for language: {language}")
-        print(f"🔎 Expected bold headers: {bold_headers}")
-
-        # ✅ Debug: Print Summary Before Processing
-        print("\n📜 Processed Summary Content:\n", summary)
-
-        lines = summary.split("\n")
-        for line in lines:
-            stripped_line = line.strip()
-
-            # ✅ If the line is a bold header, apply bold font & selected color
-            if any(stripped_line.startswith(header) for header in bold_headers):
-                print(f"✅ Applying bold color to: {stripped_line}")
-                pdf.set_font(font, "B", 14)  # Apply Bold font
-                pdf.set_text_color(r, g, b)  # Apply user-selected color
-            else:
-                pdf.set_font(font, "", 12)  # Regular font
-                pdf.set_text_color(0, 0, 0)  # Reset to default black for normal text
-
-            pdf.multi_cell(0, 10, line)
-            pdf.ln(2)
-
-        pdf.output(pdf_path)
-        print(f"✅ Minutes of Meeting saved to {pdf_path}")
+        start = time.perf_counter()
+        with telemetry.stage_timer("pdf"):
+            pages = render_pdf(document, pdf_path, font, color)
+        logger.info(f"✅ Minutes of Meeting saved to {pdf_path} ({pages} page(s) in {time.perf_counter() - start:.2f}s)")
 
         return filename
     except Exception as e:
@@ -459,51 +714,268 @@ def export_to_pdf(summary, filename="Meeting_Minutes.pdf", font="Arial", color="
         raise
 
 ### **🔹 FastAPI Endpoints**
+async def receive_upload(request):
+    """Streams a multipart upload into a job workspace, mapping ingestion errors to HTTP errors."""
+    try:
+        return await ingest_upload(request)
+    except UploadTooLarge as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+def request_languages(value, workspace=None):
+    """Parses the `language` option of a request, rejecting it (and dropping its upload) when unsupported."""
+    try:
+        return parse_languages(value)
+    except ValueError as e:
+        if workspace:
+            workspace.cleanup()
+        raise HTTPException(status_code=400, detail=str(e))
+
+def request_style(options, workspace=None):
+    """Reads and checks the `font` and `color` options of a request, rejecting (and dropping the upload of) bad ones."""
+    try:
+        return validate_style(options.get("font", "Arial"), options.get("color", "000000"))
+    except InvalidStyle as e:
+        if workspace:
+            workspace.cleanup()
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def request_options(request):
+    """Reads a JSON object body (an empty body is no options), rejecting malformed or non-object JSON."""
+    if not await request.body():
+        return {}
+    try:
+        options = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="❌ Request body must be valid JSON.")
+    if not isinstance(options, dict):
+        raise HTTPException(status_code=400, detail="❌ Request body must be a JSON object.")
+    return options
+
+def request_profile(request, options):
+    """The profiling switch: a `profile` field (`1` or `sampled`) or the `X-MoMify-Profile` header."""
+    return profiling.parse_mode(options.get("profile") or request.headers.get("x-momify-profile"))
+
+@app.on_event("startup")
+def warm_up_models():
+    """Loads the configured Whisper models once so requests share them."""
+    sweep_stale_workspaces()
+    stage_executor.submit(pdf_render.warm_up)
+    if os.getenv("WHISPER_WARMUP", "1") == "1":
+        model_registry.warm_up()
+
+@app.on_event("shutdown")
+def stop_job_pool():
+    job_manager.shutdown()
+    stage_executor.shutdown(wait=False, cancel_futures=True)
+    io_executor.shutdown(wait=False, cancel_futures=True)
+    evaluator.close()
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: stage latency histograms, transcription realtime factor, LLM tokens, job gauges."""
+    return Response(telemetry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/evaluations")
+async def evaluation_trend(days: int = 30, language: str = None):
+    """Daily averages of the readability scores of finished MoMs, oldest day first."""
+    return await run_io(evaluation_store.trend, days, language)
+
+@app.get("/models/")
+async def list_models():
+    """Returns load time and memory for the resident Whisper models."""
+    return model_registry.registry_stats()
+
 @app.post("/upload/")
-async def upload_file(
-        file: UploadFile = File(...),
-        font: str = Form("Arial"),
-        color: str = Form("000000"),
-        language: str = Form("en")
-):
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
+async def upload_file(request: Request):
+    upload = await receive_upload(request)
+    workspace, file_path = upload.workspace, upload.file_path
+    font, color = request_style(upload.fields, workspace)
+    language = request_languages(upload.fields.get("language", "en"), workspace)
+    profile = request_profile(request, upload.fields)
 
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    logger.info(f"📂 File uploaded: {upload.filename} | SHA-256: {upload.content_hash[:12]} | Font: {font} | Color: {color} | Language: {language}")
 
-    print(f"✅ Received font: {font}")
-    print(f"✅ Received color: {color}")
-    print(f"✅ Received language: {language}")
+    async def event_stream():
+        async for event in progress_generator(file_path, font=font, color=color, language=language, workspace=workspace,
+                                              profile=profile):
+            yield format_sse(event)
 
-    logger.info(f"📂 File uploaded: {file.filename} | Font: {font} | Color: {color} | Language: {language}")
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
-    async def event_stream():
-        filename = None
-        async for message in progress_generator(file_path, font=font, color=color, language=language):
-            yield message
-            if message.startswith("FILENAME::"):
-                filename = message.replace("FILENAME::", "").strip()
+@app.post("/jobs", status_code=202)
+async def create_job(request: Request):
+    """Streams the upload to disk and queues it on the worker pool, returning the job id right away."""
+    upload = await receive_upload(request)
+    font, color = request_style(upload.fields, upload.workspace)
+    language = request_languages(upload.fields.get("language", "en"), upload.workspace)
+
+    job = job_manager.submit(upload.file_path, workspace=upload.workspace, content_hash=upload.content_hash,
+                             font=font, color=color, language=language, profile=request_profile(request, upload.fields))
+    logger.info(f"📂 Job {job.id} created for {upload.filename} | Font: {font} | Color: {color} | Language: {language}")
+    return job.to_dict()
+
+async def get_upload_session(upload_id):
+    session = await upload_sessions.get(upload_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return session
+
+@app.post("/uploads", status_code=201)
+async def create_upload_session(request: Request):
+    """Opens a resumable upload; the client then PUTs numbered chunks of `chunk_size` bytes."""
+    body = await request_options(request)
+    try:
+        sha256 = str(body["sha256"]) if body.get("sha256") else None
+        session = upload_sessions.create(str(body["filename"]), int(body["size"]), sha256=sha256)
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="❌ 'filename' and 'size' are required.")
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return session.to_dict()
+
+@app.get("/uploads/{upload_id}")
+async def get_upload_session_status(upload_id: str):
+    """Returns the received offset, so an interrupted client knows which chunk to send next."""
+    return (await get_upload_session(upload_id)).to_dict()
+
+@app.put("/uploads/{upload_id}/chunks/{index}")
+async def upload_chunk(upload_id: str, index: int, request: Request):
+    """Appends one chunk, verified against its `X-Chunk-SHA256` header."""
+    session = await get_upload_session(upload_id)
+    try:
+        await upload_sessions.write_chunk(session, index, request.stream(), request.headers.get("x-chunk-sha256"))
+    except ChunkConflict as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=409, detail={"error": str(e), **e.session.to_dict()})
+    except UploadError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+    return session.to_dict()
+
+@app.post("/uploads/{upload_id}/finalize", status_code=202)
+async def finalize_upload(upload_id: str, request: Request):
+    """Seals a complete upload into a job workspace and queues it like `POST /jobs`."""
+    session = await get_upload_session(upload_id)
+    options = await request_options(request)
+    font, color = request_style(options)
+    language = request_languages(options.get("language", "en"))
+
+    async with session.lock:
+        try:
+            workspace, file_path, content_hash = upload_sessions.finalize(session)
+        except UploadError as e:
+            logger.warning(str(e))
+            raise HTTPException(status_code=409, detail=str(e))
+
+    job = job_manager.submit(file_path, workspace=workspace, content_hash=content_hash,
+                             font=font, color=color, language=language, profile=request_profile(request, options))
+    logger.info(f"📂 Job {job.id} created for {session.filename} | Font: {font} | Color: {color} | Language: {language}")
+    return job.to_dict()
+
+@app.delete("/uploads/{upload_id}", status_code=204)
+async def abort_upload(upload_id: str):
+    upload_sessions.abort(await get_upload_session(upload_id))
+    return Response(status_code=204)
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Streams the job's progress events as server-sent events until it finishes."""
+    if job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
 
-        if filename:
-            yield f"DOWNLOAD::{filename}"
+    async def event_stream():
+        sent = 0
+        while True:
+            events, finished = job_manager.events_since(job_id, sent)
+            for event in events:
+                yield format_sse(event)
+            sent += len(events)
+            if finished and not events:
+                break
+            await asyncio.sleep(0.5)
 
     return StreamingResponse(event_stream(), media_type="text/event-stream")
 
-@app.get("/download/{filename}")
-async def download_file(filename: str):
-    filepath = os.path.abspath(os.path.join(OUTPUT_DIR, filename))
-    print(f"Trying to serve file: {filepath}")
-    logger.info(f"📥 Trying to serve file: {filepath}")
-
-    if not os.path.exists(filepath):
-        print("❌ File not found!")
-        logger.error("❌ File not found!")
-        return {"error": "File not found"}
-
-    # ✅ Force the browser to download the file instead of opening it
-    return FileResponse(
-        path=filepath,
-        media_type="application/pdf",
-        filename=filename,
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
\ No newline at end of file
+@app.get("/jobs/{job_id}/mom")
+async def get_job_mom(job_id: str, language: str = None):
+    """Returns the structured MoM of a finished job (its first language unless `language` is given)."""
+    try:
+        language = language or next(iter(mom_store.languages(job_id)), "en")
+        document, _ = mom_store.load(job_id, language)
+    except ValueError:
+        document = None
+    if document is None:
+        raise HTTPException(status_code=404, detail="MoM not found")
+    return document.to_dict()
+
+@app.api_route("/jobs/{job_id}/export/{fmt}", methods=["GET", "HEAD"])
+async def export_job_mom(job_id: str, fmt: str, request: Request, language: str = None, font: str = None, color: str = None):
+    """Renders a finished job's MoM as `pdf`, `md`, `docx` or `json`, optionally restyled."""
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=404, detail=f"Unsupported format. Choose from {', '.join(FORMATS)}.")
+    try:
+        language = language or next(iter(mom_store.languages(job_id)), "en")
+        path = await run_io(mom_store.render, job_id, language, fmt, font, color)
+    except InvalidStyle as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError:
+        path = None
+    if path is None:
+        raise HTTPException(status_code=404, detail="MoM not found")
+
+    extension, media_type, _ = FORMATS[fmt]
+    return await run_io(serve_file, request, path, media_type, download_name(job_id, language, extension))
+
+@app.get("/jobs/{job_id}/profile")
+async def download_job_profile(job_id: str, request: Request, format: str = "speedscope"):
+    """Serves the trace of a profiled job as a speedscope or Chrome-trace JSON file."""
+    if format not in profiling.PROFILE_FORMATS:
+        raise HTTPException(status_code=404, detail=f"Unsupported format. Choose from {', '.join(profiling.PROFILE_FORMATS)}.")
+    try:
+        path = mom_store.profile_path(job_id, format)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    response = await run_io(serve_file, request, path, profiling.PROFILE_FORMATS[format],
+                                  f"MoMify_Profile_{job_id}.{format}.json")
+    if response is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return response
+
+@app.api_route("/download/{name}", methods=["GET", "HEAD"])
+async def download_file(name: str, request: Request, language: str = None):
+    """
+    Serves a job's PDF by job id (`?language=` picks one of its languages), or a PDF in
+    `OUTPUT_DIR` by file name. Supports `If-None-Match` (304) and `Range` (206) requests.
+    """
+    languages = mom_store.languages(name) if name.isalnum() else []
+    if languages:
+        language = language or languages[0]
+        filepath, filename = mom_store.pdf_path(name, language), download_name(name, language)
+        if not os.path.exists(filepath) and language in languages:
+            # ✅ A MoM stored without its PDF (e.g. after a failed export) is rendered on demand
+            filepath = await run_io(mom_store.render, name, language, "pdf")
+    else:
+        filename = os.path.basename(name)
+        filepath = os.path.join(OUTPUT_DIR, filename)
+
+    response = await run_io(serve_file, request, filepath, "application/pdf", filename)
+    if response is None:
+        logger.warning(f"❌ Download not found: {name}")
+        raise HTTPException(status_code=404, detail="File not found")
+
+    logger.info(f"📥 Serving {filepath} ({response.status_code})")
+    return response
@@ -0,0 +1,65 @@
+import hashlib
+import threading
+import subprocess
+from collections import deque
+import numpy as np
+from logger import logger
+
+SAMPLE_RATE = 16000
+READ_CHUNK_SIZE = 1024 * 1024
+STDERR_TAIL_LINES = 50
+
+VIDEO_EXTENSIONS = [".mp4", ".mov", ".avi", ".mkv", ".webm"]
+AUDIO_EXTENSIONS = [".wav", ".mp3", ".m4a", ".wma", ".aac", ".flac", ".ogg"]
+
+
+def decode_audio(file_path, sample_rate=SAMPLE_RATE):
+    """
+    Decodes the first audio stream of a media file into Whisper-ready samples in one ffmpeg pass.
+
+    Only the audio stream is demuxed (`-map 0:a:0 -vn`), so video frames are never decoded, and
+    ffmpeg resamples straight to mono float32 at `sample_rate`. The PCM is streamed from ffmpeg's
+    stdout into a single buffer; no intermediate WAV is written.
+
+    Args:
+        file_path (str): Audio or video file.
+        sample_rate (int): Output sample rate (Whisper expects 16 kHz).
+
+    Returns:
+        np.ndarray: Mono float32 samples in [-1, 1].
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-threads", "0",
+        "-i", file_path,
+        "-map", "0:a:0", "-vn", "-sn", "-dn",
+        "-ac", "1", "-ar", str(sample_rate), "-f", "f32le", "-",
+    ]
+
+    buffer = bytearray()
+    stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as process:
+        # ✅ Drain stderr while stdout is read: a corrupt input can fill the stderr pipe and stall ffmpeg
+        stderr_reader = threading.Thread(target=stderr_tail.extend, args=(process.stderr,), daemon=True)
+        stderr_reader.start()
+        while True:
+            chunk = process.stdout.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            buffer += chunk
+        returncode = process.wait()
+        stderr_reader.join()
+    stderr = b"".join(stderr_tail).decode("utf-8", errors="replace")
+
+    if returncode != 0:
+        if "matches no streams" in stderr:
+            raise ValueError("❌ No audio found in the video file!")
+        raise RuntimeError(f"❌ ffmpeg failed to decode {file_path}: {stderr.strip()}")
+
+    audio = np.frombuffer(buffer, dtype=np.float32)
+    logger.info(f"✅ Decoded {len(audio) / sample_rate:.1f}s of audio ({audio.nbytes / (1024 * 1024):.1f} MB PCM)")
+    return audio
+
+
+def audio_sha256(audio):
+    """Returns the SHA-256 of decoded samples, so identical audio in different containers hashes the same."""
+    return hashlib.sha256(memoryview(np.ascontiguousarray(audio))).hexdigest()
@@ -0,0 +1,96 @@
+"""
+Microbenchmark: legacy per-word chunking vs. the single-pass token chunker.
+
+    python benchmarks/bench_chunking.py --words 5000 20000 80000
+
+For each synthetic transcript size it prints wall-clock time for both splitters,
+the speedup, and the largest chunk measured in real tokens (the legacy splitter
+counts each word separately, so its chunks can exceed `max_tokens`).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tiktoken
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from chunking import split_text_into_chunks, count_tokens  # noqa: E402
+
+VOCABULARY = ("the team agreed to ship the release next sprint while marketing prepares "
+              "launch notes budget review pending approval from finance customers reported "
+              "latency issues in the dashboard action item follow up with vendor").split()
+
+
+def synthetic_transcript(words, seed=0):
+    rng = random.Random(seed)
+    sentences = []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(6, 24))
+        sentence = " ".join(rng.choice(VOCABULARY) for _ in range(length))
+        sentences.append(sentence.capitalize() + rng.choice([".", ".", ".", "?", "!"]))
+        remaining -= length
+    return " ".join(sentences)
+
+
+def legacy_split(text, max_tokens=7500):
+    """The original per-word implementation, kept here as the baseline."""
+    def legacy_count(word, model="gpt-4"):
+        enc = tiktoken.encoding_for_model(model)
+        return len(enc.encode(word))
+
+    chunks, current_chunk, current_token_count = [], [], 0
+    for word in text.split():
+        word_token_count = legacy_count(word)
+        if current_token_count + word_token_count > max_tokens:
+            chunks.append(" ".join(current_chunk))
+            current_chunk, current_token_count = [], 0
+        current_chunk.append(word)
+        current_token_count += word_token_count
+    if current_chunk:
+        chunks.append(" ".join(current_chunk))
+    return chunks
+
+
+def timed(function, *args, repeat=3):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, nargs="+", default=[5_000, 20_000, 80_000])
+    parser.add_argument("--max-tokens", type=int, default=7500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    split_text_into_chunks("warm up the encoder cache.")
+    results = []
+    for words in args.words:
+        text = synthetic_transcript(words)
+        legacy_seconds, legacy_chunks = timed(legacy_split, text, args.max_tokens, repeat=args.repeat)
+        new_seconds, new_chunks = timed(split_text_into_chunks, text, args.max_tokens, repeat=args.repeat)
+        results.append({
+            "words": words,
+            "tokens": count_tokens(text),
+            "legacy_seconds": round(legacy_seconds, 4),
+            "single_pass_seconds": round(new_seconds, 4),
+            "speedup": round(legacy_seconds / new_seconds, 1) if new_seconds else None,
+            "legacy_chunks": len(legacy_chunks),
+            "single_pass_chunks": len(new_chunks),
+            "legacy_max_chunk_tokens": max(count_tokens(c) for c in legacy_chunks),
+            "single_pass_max_chunk_tokens": max(count_tokens(c) for c in new_chunks),
+        })
+
+    print(json.dumps({"max_tokens": args.max_tokens, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
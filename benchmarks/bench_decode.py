@@ -0,0 +1,86 @@
+"""
+Benchmark: legacy WAV round-trip vs. single-pass in-memory decode.
+
+    python benchmarks/bench_decode.py inputs/meeting.mkv
+
+"legacy" reproduces the old path: MoviePy (video) or pydub (audio) writes a
+full-rate WAV, then Whisper re-reads and resamples it with ffmpeg.
+"streaming" is `audio_decode.decode_audio`, which demuxes only the audio stream
+and produces 16 kHz mono float32 directly. Each mode runs in a fresh process so
+peak RSS is measured independently (ffmpeg children are reported separately).
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def legacy_decode(file_path):
+    import whisper
+    from moviepy.video.io.VideoFileClip import VideoFileClip
+    from pydub import AudioSegment
+    from audio_decode import VIDEO_EXTENSIONS
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audio_path = os.path.join(tmp_dir, "extracted_audio.wav")
+        if os.path.splitext(file_path)[1].lower() in VIDEO_EXTENSIONS:
+            VideoFileClip(file_path).audio.write_audiofile(audio_path, codec="pcm_s16le", logger=None)
+        else:
+            AudioSegment.from_file(file_path).export(audio_path, format="wav")
+        return whisper.load_audio(audio_path)
+
+
+def streaming_decode(file_path):
+    from audio_decode import decode_audio
+    return decode_audio(file_path)
+
+
+def run_mode(mode, file_path):
+    """Runs one decode in this process and prints its measurements as JSON."""
+    decode = legacy_decode if mode == "legacy" else streaming_decode
+    start = time.perf_counter()
+    audio = decode(file_path)
+    seconds = time.perf_counter() - start
+
+    # ✅ ru_maxrss is KiB on Linux
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    print(json.dumps({
+        "mode": mode,
+        "decode_seconds": round(seconds, 3),
+        "audio_seconds": round(len(audio) / 16000, 1),
+        "peak_rss_mb": round(self_usage.ru_maxrss / 1024, 1),
+        "peak_child_rss_mb": round(child_usage.ru_maxrss / 1024, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help="Audio or video file to decode")
+    parser.add_argument("--mode", choices=["legacy", "streaming"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.file)
+        return
+
+    results = {}
+    for mode in ("legacy", "streaming"):
+        output = subprocess.run([sys.executable, __file__, args.file, "--mode", mode],
+                                capture_output=True, text=True, check=True, cwd=ROOT).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    results["speedup"] = round(results["legacy"]["decode_seconds"] / results["streaming"]["decode_seconds"], 2)
+    results["rss_saved_mb"] = round(results["legacy"]["peak_rss_mb"] - results["streaming"]["peak_rss_mb"], 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: hot-path logging cost per job, legacy synchronous handlers vs. the queue writer.
+
+    python benchmarks/bench_logging.py --jobs 2000
+
+"legacy" reproduces the old `logger.py`: file, console and in-memory list handlers
+running on the caller's thread, plus the `print` duplicates `app.py` used to emit.
+"queue" is the current `logger` module: callers only enqueue, one background thread
+writes JSON to the file, the console and the bounded UI buffer. Each job logs
+`--records` lines (the legacy mode also prints `--prints` lines). Each mode runs in a
+fresh process inside a scratch directory with stdout/stderr discarded, so console
+cost is writing to /dev/null in both modes.
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def legacy_logger():
+    log_messages = []
+
+    class StreamlitLogHandler(logging.Handler):
+        def emit(self, record):
+            log_messages.append(self.format(record))
+
+    os.makedirs("logs", exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s",
+        handlers=[logging.FileHandler(os.path.join("logs", "momify.log"), encoding="utf-8"),
+                  logging.StreamHandler(), StreamlitLogHandler()],
+    )
+    return logging.getLogger("MoMify"), log_messages, lambda: None
+
+
+def queue_logger():
+    sys.path.insert(0, ROOT)
+    import logger as momify_logger
+    return momify_logger.logger, momify_logger.log_messages, momify_logger.stop_logging
+
+
+def run_mode(mode, jobs, records, prints):
+    logger, log_messages, flush = legacy_logger() if mode == "legacy" else queue_logger()
+    prints = prints if mode == "legacy" else 0
+
+    start = time.perf_counter()
+    for job in range(jobs):
+        for index in range(records):
+            logger.info(f"📌 Chunk {index}/{records} of job {job:06d} summarized in {0.1 * index:.1f}s")
+        for index in range(prints):
+            print(f"🎨 Chosen font: Poppins ({index})")
+    hot_path = time.perf_counter() - start
+
+    flush_start = time.perf_counter()
+    flush()
+    flush_seconds = time.perf_counter() - flush_start
+
+    print(json.dumps({
+        "mode": mode,
+        "per_job_us": round(hot_path / jobs * 1e6, 1),
+        "per_record_us": round(hot_path / (jobs * records) * 1e6, 2),
+        "drain_after_last_call_ms": round(flush_seconds * 1000, 1),
+        "ui_buffer_entries": len(log_messages),
+        "ui_buffer_bytes": sum(len(line.encode("utf-8")) for line in log_messages),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--records", type=int, default=60, help="logger calls per job")
+    parser.add_argument("--prints", type=int, default=14, help="print() duplicates per job (legacy only)")
+    parser.add_argument("--mode", choices=["legacy", "queue"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.jobs, args.records, args.prints)
+        return
+
+    results = {}
+    for mode in ("legacy", "queue"):
+        with tempfile.TemporaryDirectory() as work_dir:
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--mode", mode, "--jobs", str(args.jobs),
+                 "--records", str(args.records), "--prints", str(args.prints)],
+                cwd=work_dir, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True,
+            )
+        results[mode] = json.loads(result.stdout.strip().splitlines()[-1])
+
+    results["hot_path_speedup"] = round(results["legacy"]["per_job_us"] / results["queue"]["per_job_us"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark: per-PDF latency and throughput of the MoM renderer.
+
+    python benchmarks/bench_pdf.py --iterations 20
+
+"legacy" reproduces the old `export_to_pdf`: a fresh `FPDF` per call that
+re-registers the Poppins fonts, re-decodes the footer logo and re-formats the
+footer on every page. "cached" parses the summary into a `MoMDocument` and
+renders it with `pdf_render.render_pdf`, which loads font metrics and the logo
+once per process. Both render a 1-page and a 30-page MoM; each mode runs in a
+fresh process so the first (cold) render is included.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+HEADERS = ["Meeting Title:", "Date & Time:", "Attendees:", "Agenda:",
+           "Discussion Points:", "Action Items:", "Conclusion:", "Next Meeting Date:"]
+SENTENCE = ("The team reviewed the release plan and agreed to move the migration to the next sprint "
+            "after checking the dependencies with the platform group.")
+
+
+def synthetic_mom(pages):
+    """A MoM in the LLM's output format, roughly `pages` pages long."""
+    lines = []
+    for section in range(max(1, round(pages * 2.3))):
+        lines.append(f"**{HEADERS[section % len(HEADERS)]}**")
+        lines.extend(f"- {SENTENCE}" for _ in range(4))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def legacy_render(summary, pdf_path, font, rgb, language):
+    from fpdf import FPDF
+
+    class LegacyPDF(FPDF):
+        def footer(self):
+            self.set_y(-15)
+            self.set_font("Arial", "I", 10)
+            self.set_text_color(150, 150, 150)
+            footer_text = f"Generated by MoMify | {datetime.now().strftime('%B %d, %Y at %I:%M %p')}"
+            total_width = self.get_string_width(footer_text) + 6 + 5
+            x_position = (self.w - total_width) / 2
+            y_position = self.get_y() + 1
+            print(f"📌 Footer Debug Info: {self.w} {total_width} {x_position} {y_position}")
+            self.image("assets/logo.png", x=x_position, y=y_position - 1, w=6, h=6)
+            self.set_xy(x_position + 6 + 3, y_position)
+            self.cell(0, 6, footer_text, align="L")
+
+    pdf = LegacyPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    pdf.add_font("Poppins", "", "assets/fonts/Poppins-Regular.ttf", uni=True)
+    pdf.add_font("Poppins", "B", "assets/fonts/Poppins-Bold.ttf", uni=True)
+    pdf.set_font(font, "B", 20)
+    pdf.set_text_color(*rgb)
+    pdf.cell(200, 10, "MEETING MINUTES", ln=True, align='C')
+    pdf.ln(2)
+    pdf.set_draw_color(*rgb)
+    pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+    pdf.ln(8)
+    for line in summary.replace("**", "").split("\n"):
+        if any(line.strip().startswith(header) for header in HEADERS):
+            print(f"✅ Applying bold color to: {line}")
+            pdf.set_font(font, "B", 14)
+            pdf.set_text_color(*rgb)
+        else:
+            pdf.set_font(font, "", 12)
+            pdf.set_text_color(0, 0, 0)
+        pdf.multi_cell(0, 10, line)
+        pdf.ln(2)
+    pdf.output(pdf_path)
+    return pdf.page_no()
+
+
+def run_mode(mode, iterations, font):
+    """Renders both document sizes `iterations` times in this process and prints JSON results."""
+    if mode == "legacy":
+        render = legacy_render
+    else:
+        from mom_document import MoMDocument
+        from pdf_render import render_pdf
+
+        def render(summary, pdf_path, font, rgb, language):
+            return render_pdf(MoMDocument.parse(summary, language), pdf_path, font, "%02X%02X%02X" % rgb)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for pages in (1, 30):
+            summary = synthetic_mom(pages)
+            latencies = []
+            for i in range(iterations):
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    page_count = render(summary, os.path.join(tmp_dir, f"{pages}_{i}.pdf"), font, (206, 8, 161), "en")
+                latencies.append(time.perf_counter() - start)
+            results[f"{pages}_page"] = {
+                "pages_rendered": page_count,
+                "first_ms": round(latencies[0] * 1000, 1),
+                "median_ms": round(statistics.median(latencies[1:] or latencies) * 1000, 1),
+                "pdfs_per_second": round(len(latencies) / sum(latencies), 2),
+            }
+    print(json.dumps({"mode": mode, **results}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10, help="Renders per document size")
+    parser.add_argument("--font", default="Poppins", help="Body font (Arial, Courier, Times, Helvetica, Poppins)")
+    parser.add_argument("--mode", choices=["legacy", "cached"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.iterations, args.font)
+        return
+
+    results = {}
+    for mode in ("legacy", "cached"):
+        output = subprocess.run([sys.executable, __file__, "--mode", mode, "--iterations", str(args.iterations),
+                                 "--font", args.font], capture_output=True, text=True, check=True, cwd=ROOT).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    for size in ("1_page", "30_page"):
+        results[f"speedup_{size}"] = round(results["legacy"][size]["median_ms"] / results["cached"][size]["median_ms"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Benchmark suite: per-stage latency of the MoM pipeline on synthetic fixtures.
+
+    python benchmarks/bench_stages.py --seconds 60 300 --models tiny base --output bench.json
+    python benchmarks/bench_stages.py --baseline bench_previous.json --tolerance 0.25
+
+Fixtures are generated with ffmpeg (WAV, MP3 and MP4 with a test-pattern video
+track) for each `--seconds` length. The stages timed are `extract_audio` per
+fixture, `transcribe_audio` per Whisper model size, `split_text_into_chunks`
+and `summarize_text` on a synthetic transcript, and `export_to_pdf`. The LLM is
+replaced by a deterministic local stand-in (`--llm-latency` simulates the
+round trip), so runs need no API key and are reproducible. Transcript and
+summary caches live in a temporary directory and are cleared before every
+iteration, so each iteration does the full work.
+
+Pass `--audio` to transcribe a real recording instead of the synthetic tone.
+With `--baseline`, every stage median is compared with an earlier result file
+and the exit status is 1 when any stage is slower by more than `--tolerance`.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FIXTURE_FORMATS = {
+    "wav": ["-c:a", "pcm_s16le"],
+    "mp3": ["-c:a", "libmp3lame", "-b:a", "128k"],
+    "mp4": ["-c:v", "mpeg4", "-q:v", "10", "-c:a", "aac", "-b:a", "128k", "-shortest"],
+}
+# ✅ A warbling tone: Whisper runs its full encoder/decoder loop on it, unlike on silence
+TONE = "aevalsrc='0.3*sin(2*PI*(180+60*sin(2*PI*2.5*t))*t)+0.02*(random(0)-0.5)':s=44100:d={seconds}"
+VOCABULARY = ("the team agreed to ship the release next sprint while marketing prepares "
+              "launch notes budget review pending approval from finance customers reported "
+              "latency issues in the dashboard action item follow up with vendor Ana Budi "
+              "will send the revised timeline before Friday").split()
+WORDS_PER_SECOND = 2.5  # typical conversational speech rate
+
+
+### **🔹 Fixtures**
+def make_fixture(directory, seconds, fmt):
+    """Generates a synthetic `seconds`-long media file, reusing it when already present."""
+    path = os.path.join(directory, f"fixture_{seconds}s.{fmt}")
+    if os.path.exists(path):
+        return path
+
+    command = ["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-f", "lavfi", "-i", TONE.format(seconds=seconds)]
+    if fmt == "mp4":
+        command += ["-f", "lavfi", "-i", f"testsrc=size=640x360:rate=25:duration={seconds}"]
+    command += FIXTURE_FORMATS[fmt] + [path]
+
+    try:
+        result = subprocess.run(command, capture_output=True, text=True)
+    except FileNotFoundError:
+        sys.exit("❌ ffmpeg is required to generate the benchmark fixtures.")
+    if result.returncode != 0:
+        print(f"⚠️ Skipping {fmt} fixture: {result.stderr.strip()}", file=sys.stderr)
+        return None
+    return path
+
+
+def synthetic_transcript(seconds, seed=0):
+    """A transcript of roughly the length a `seconds`-long meeting produces."""
+    rng = random.Random(seed)
+    sentences, remaining = [], int(seconds * WORDS_PER_SECOND)
+    while remaining > 0:
+        length = min(remaining, rng.randint(6, 24))
+        sentence = " ".join(rng.choice(VOCABULARY) for _ in range(length))
+        sentences.append(sentence.capitalize() + rng.choice([".", ".", ".", "?"]))
+        remaining -= length
+    return " ".join(sentences)
+
+
+### **🔹 Deterministic LLM stand-in**
+class StubLLM:
+    """
+    Answers like the MoM prompts expect, without a network call.
+
+    The reply depends only on the prompt: it lists the section headers the prompt asks for
+    and fills each with bullets drawn from the prompt text. `latency` seconds are awaited per
+    call, plus the time to "generate" the reply at `tokens_per_second` when given.
+    """
+
+    model_name = "bench-stub"
+    temperature = 0
+
+    def __init__(self, headers, latency=0.0, tokens_per_second=None):
+        self.headers = headers
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        prompt = "\n".join(message.content for message in messages)
+        rng = random.Random(len(prompt))
+        words = prompt.split()
+
+        lines = []
+        for header in [header for header in self.headers if header in prompt] or self.headers[:1]:
+            lines.append(header)
+            for _ in range(3):
+                start = rng.randrange(max(1, len(words) - 12))
+                lines.append("- " + " ".join(words[start:start + 12]).replace("*", ""))
+            lines.append("")
+        content = "\n".join(lines)
+
+        delay = self.latency
+        if self.tokens_per_second:
+            delay += len(content.split()) * 1.3 / self.tokens_per_second
+        if delay:
+            await asyncio.sleep(delay)
+        return SimpleNamespace(content=content)
+
+
+### **🔹 Timing**
+def measure(function, iterations, before_each=None):
+    """Runs `function` `iterations` times (stdout silenced) and returns latency stats in ms."""
+    latencies, result = [], None
+    for _ in range(iterations):
+        if before_each:
+            before_each()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = function()
+        latencies.append(time.perf_counter() - start)
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    stats = {
+        "iterations": iterations,
+        "median_ms": round(statistics.median(latencies_ms), 2),
+        "min_ms": round(latencies_ms[0], 2),
+        "max_ms": round(latencies_ms[-1], 2),
+        "first_ms": round(latencies[0] * 1000, 2),
+    }
+    return stats, result
+
+
+def clear_caches(app):
+    for cache in (app.transcript_cache, app.summary_cache):
+        shutil.rmtree(cache.directory, ignore_errors=True)
+        os.makedirs(cache.directory, exist_ok=True)
+
+
+def run_suite(args, work_dir):
+    # ✅ Caches and outputs go to the scratch directory, never the real ones
+    os.environ["MOMIFY_CACHE_DIR"] = os.path.join(work_dir, "cache")
+    os.environ.setdefault("WHISPER_WARMUP", "0")
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+    from mom_document import MoMDocument
+    app.OUTPUT_DIR = os.path.join(work_dir, "outputs")
+
+    stub = StubLLM([header for headers in app.SECTION_HEADERS.values() for header in headers],
+                   args.llm_latency, args.llm_tokens_per_second)
+    app.create_llm = lambda: stub
+    reset = lambda: clear_caches(app)  # noqa: E731
+
+    fixtures_dir = args.fixtures_dir or os.path.join(work_dir, "fixtures")
+    os.makedirs(fixtures_dir, exist_ok=True)
+    stages = {}
+
+    for seconds in args.seconds:
+        label = f"{seconds}s"
+
+        if "extract" in args.stages:
+            for fmt in args.formats:
+                path = make_fixture(fixtures_dir, seconds, fmt)
+                if path is None:
+                    continue
+                stats, _ = measure(lambda: app.extract_audio(path), args.iterations)
+                stages[f"extract_audio/{fmt}/{label}"] = {**stats, "audio_seconds": seconds,
+                                                          "fixture_bytes": os.path.getsize(path)}
+
+        if "transcribe" in args.stages:
+            audio_path = args.audio or make_fixture(fixtures_dir, seconds, "wav")
+            audio = app.extract_audio(audio_path)
+            audio_seconds = len(audio) / app.SAMPLE_RATE
+            for model_size in args.models:
+                load_start = time.perf_counter()
+                app.model_registry.get_model(model_size)
+                load_ms = (time.perf_counter() - load_start) * 1000
+                stats, _ = measure(lambda: app.transcribe_audio(audio, model_size=model_size),
+                                   args.transcribe_iterations, before_each=reset)
+                stages[f"transcribe/{model_size}/{label}"] = {
+                    **stats, "audio_seconds": round(audio_seconds, 1), "model_load_ms": round(load_ms, 1),
+                    "realtime_factor": round(stats["median_ms"] / 1000 / audio_seconds, 4),
+                }
+            del audio
+
+        transcript = synthetic_transcript(seconds)
+
+        if "chunk" in args.stages:
+            stats, chunks = measure(lambda: app.split_text_into_chunks(transcript, app.CHUNK_MAX_TOKENS,
+                                                                       app.CHUNK_OVERLAP_TOKENS), args.iterations)
+            stages[f"split_text_into_chunks/{label}"] = {**stats, "words": len(transcript.split()),
+                                                         "chunks": len(chunks)}
+
+        if "summarize" in args.stages:
+            calls_before = stub.calls
+            stats, _ = measure(lambda: app.summarize_text(transcript, ("en",)), args.iterations, before_each=reset)
+            stages[f"summarize_text/{label}"] = {**stats, "llm_calls": (stub.calls - calls_before) // args.iterations,
+                                                 "llm_latency_s": args.llm_latency}
+
+        if "pdf" in args.stages:
+            with contextlib.redirect_stdout(io.StringIO()):
+                document = MoMDocument.parse(app.summarize_text(transcript, ("en",))["en"], "en")
+            stats, filename = measure(lambda: app.export_to_pdf(document, font=args.font, color="CE08A1"),
+                                      args.iterations)
+            stages[f"export_to_pdf/{label}"] = {**stats, "pdf_bytes": os.path.getsize(os.path.join(app.OUTPUT_DIR, filename))}
+
+    return stages
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                              cwd=ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(stages, baseline, tolerance):
+    """Returns `{stage: ratio}` for stages whose median grew by more than `tolerance` versus `baseline`."""
+    regressions = {}
+    for name, stats in stages.items():
+        previous = baseline.get("stages", {}).get(name)
+        if previous and previous["median_ms"] > 0:
+            ratio = stats["median_ms"] / previous["median_ms"]
+            stats["baseline_ratio"] = round(ratio, 3)
+            if ratio > 1 + tolerance:
+                regressions[name] = round(ratio, 3)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=int, nargs="+", default=[60, 600], help="Fixture lengths in seconds")
+    parser.add_argument("--stages", nargs="+", default=["extract", "transcribe", "chunk", "summarize", "pdf"],
+                        choices=["extract", "transcribe", "chunk", "summarize", "pdf"])
+    parser.add_argument("--formats", nargs="+", default=list(FIXTURE_FORMATS), choices=list(FIXTURE_FORMATS))
+    parser.add_argument("--models", nargs="+", default=["tiny"], help="Whisper model sizes to transcribe with")
+    parser.add_argument("--audio", help="Transcribe this recording instead of the synthetic tone")
+    parser.add_argument("--iterations", type=int, default=5, help="Runs per stage")
+    parser.add_argument("--transcribe-iterations", type=int, default=1, help="Runs per transcription")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated seconds per LLM call")
+    parser.add_argument("--llm-tokens-per-second", type=float, help="Simulated LLM generation speed")
+    parser.add_argument("--font", default="Poppins")
+    parser.add_argument("--fixtures-dir", help="Keep generated fixtures here (default: a temporary directory)")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--baseline", help="Earlier JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown versus the baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="momify-bench-") as work_dir:
+        stages = run_suite(args, work_dir)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        },
+        "stages": stages,
+    }
+
+    regressions = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(stages, json.load(f), args.tolerance)
+        results["regressions"] = regressions
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+    if regressions:
+        print(f"❌ {len(regressions)} stage(s) slower than the baseline by more than {args.tolerance:.0%}: "
+              f"{', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
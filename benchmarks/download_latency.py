@@ -0,0 +1,120 @@
+"""
+Load test: measures /download/ latency while uploads are being processed.
+
+Run the API first (`uvicorn app:app --port 8000`), make sure at least one job has
+finished (its PDF lives in `outputs/<job_id>/`), then:
+
+    python benchmarks/download_latency.py --file inputs/meeting-short.mp4 --uploads 2
+
+The script samples download latency for a baseline window, then keeps sampling
+while the uploads run. With the event loop unblocked, both percentiles should
+stay close to each other.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mom_store import MoMStore, download_url  # noqa: E402
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def latest_job(store):
+    """The job whose PDF was written last, with its first language, or (None, None)."""
+    pdfs = [(os.path.getmtime(store.pdf_path(job_id, language)), job_id, language)
+            for job_id in store.jobs() for language in store.languages(job_id)[:1]
+            if os.path.exists(store.pdf_path(job_id, language))]
+    if not pdfs:
+        return None, None
+    _, job_id, language = max(pdfs)
+    return job_id, language
+
+
+def summarize(samples):
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "max_ms": max(samples) if samples else None,
+        "mean_ms": statistics.mean(samples) if samples else None,
+    }
+
+
+async def sample_downloads(client, url, stop_event, samples, interval):
+    while not stop_event.is_set():
+        start = time.perf_counter()
+        response = await client.get(url)
+        samples.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+        await asyncio.sleep(interval)
+
+
+async def run_upload(client, api_url, file_path):
+    with open(file_path, "rb") as f:
+        files = {"file": (os.path.basename(file_path), f.read())}
+    async with client.stream("POST", f"{api_url}/upload/", files=files, data={"language": "en"}) as response:
+        async for _ in response.aiter_lines():
+            pass
+
+
+async def main(args):
+    # ✅ Without a language the API serves the job's first one
+    path = download_url(args.job_id, args.language) if args.language else f"/download/{args.job_id}"
+    url = args.api_url + path
+    timeout = httpx.Timeout(None)
+
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        baseline, loaded = [], []
+
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_downloads(client, url, stop, baseline, args.interval))
+        await asyncio.sleep(args.baseline_seconds)
+        stop.set()
+        await sampler
+
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_downloads(client, url, stop, loaded, args.interval))
+        start = time.perf_counter()
+        await asyncio.gather(*(run_upload(client, args.api_url, args.file) for _ in range(args.uploads)))
+        upload_seconds = time.perf_counter() - start
+        stop.set()
+        await sampler
+
+    print(json.dumps({
+        "uploads": args.uploads,
+        "upload_seconds": round(upload_seconds, 2),
+        "baseline": summarize(baseline),
+        "during_uploads": summarize(loaded),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api-url", default="http://localhost:8000")
+    parser.add_argument("--file", required=True, help="Recording to upload")
+    parser.add_argument("--job-id", default=None, help="Finished job whose PDF is downloaded (defaults to the newest one)")
+    parser.add_argument("--language", default=None, help="Language of the job's PDF (defaults to its first language)")
+    parser.add_argument("--uploads", type=int, default=1, help="Concurrent uploads")
+    parser.add_argument("--interval", type=float, default=0.1, help="Seconds between download requests")
+    parser.add_argument("--baseline-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.job_id is None:
+        args.job_id, language = latest_job(MoMStore())
+        if args.job_id is None:
+            parser.error("No finished job found in outputs/. Pass --job-id or run a job first.")
+        args.language = args.language or language
+
+    asyncio.run(main(args))
@@ -0,0 +1,131 @@
+import bisect
+import functools
+import tiktoken
+
+SENTENCE_ENDINGS = (b".", b"!", b"?", b"\xe3\x80\x82")  # "。" for CJK transcripts
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(model="gpt-4"):
+    """Returns the tokenizer for `model`, built once per process."""
+    return tiktoken.encoding_for_model(model)
+
+
+def count_tokens(text, model="gpt-4"):
+    """Returns the number of tokens in a string using OpenAI's tokenizer."""
+    return len(get_encoding(model).encode(text))
+
+
+def _boundaries(encoding, tokens):
+    """
+    Classifies every cut position after token `i` in a single pass.
+
+    Returns:
+        tuple: (sentence_cuts, word_cuts) as sorted lists of token indices where a chunk may end.
+    """
+    sentence_cuts = []
+    word_cuts = []
+    token_bytes = [encoding.decode_single_token_bytes(token) for token in tokens]
+
+    for i in range(len(tokens) - 1):
+        if token_bytes[i].rstrip().endswith(SENTENCE_ENDINGS):
+            sentence_cuts.append(i + 1)
+        if token_bytes[i + 1][:1].isspace():
+            word_cuts.append(i + 1)
+
+    return sentence_cuts, word_cuts
+
+
+def _last_cut_in(cuts, low, high):
+    """Returns the largest cut in (low, high], or None."""
+    index = bisect.bisect_right(cuts, high) - 1
+    if index >= 0 and cuts[index] > low:
+        return cuts[index]
+    return None
+
+
+def split_text_into_chunks(text, max_tokens=7500, overlap_tokens=0, model="gpt-4"):
+    """
+    Splits long text into chunks of at most `max_tokens` tokens, encoding the text only once.
+
+    Chunks end on a sentence boundary when one falls in the second half of the token window,
+    otherwise on a word boundary, so no chunk stops mid-word or mid-character.
+
+    Args:
+        text (str): The transcript to split.
+        max_tokens (int): Token budget per chunk.
+        overlap_tokens (int): Tokens repeated at the start of the next chunk for context.
+        model (str): Model whose tokenizer defines the budget.
+
+    Returns:
+        list[str]: The chunks, in order.
+    """
+    if not text.strip():
+        return []
+
+    encoding = get_encoding(model)
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return [text.strip()]
+
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
+    sentence_cuts, word_cuts = _boundaries(encoding, tokens)
+
+    chunks = []
+    start = 0
+    while start < len(tokens):
+        end = min(start + max_tokens, len(tokens))
+        if end < len(tokens):
+            # ✅ Prefer a sentence end, then a word start, keeping chunks at least half full
+            min_end = start + max_tokens // 2
+            end = (_last_cut_in(sentence_cuts, min_end, end)
+                   or _last_cut_in(word_cuts, start, end)
+                   or end)
+
+        chunk = encoding.decode(tokens[start:end]).strip()
+        if chunk:
+            chunks.append(chunk)
+
+        if end >= len(tokens):
+            break
+
+        next_start = end - overlap_tokens
+        if overlap_tokens:
+            # ✅ Start the overlap on a word so the next chunk does not open mid-word
+            next_start = _last_cut_in(word_cuts, start, next_start) or next_start
+        start = max(next_start, start + 1)
+
+    return chunks
+
+
+class StreamingChunker:
+    """
+    Builds chunks incrementally from transcript text that arrives piece by piece.
+
+    `feed` returns the chunks whose token budget has filled; the unfinished tail stays
+    buffered (including any overlap) until more text arrives or `flush` is called.
+    """
+
+    def __init__(self, max_tokens=7500, overlap_tokens=0, model="gpt-4"):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.model = model
+        self.buffer = ""
+
+    def feed(self, text):
+        text = text.strip()
+        if not text:
+            return []
+
+        self.buffer = f"{self.buffer} {text}" if self.buffer else text
+        if count_tokens(self.buffer, self.model) <= self.max_tokens:
+            return []
+
+        chunks = split_text_into_chunks(self.buffer, self.max_tokens, self.overlap_tokens, self.model)
+        self.buffer = chunks.pop()
+        return chunks
+
+    def flush(self):
+        chunks = [self.buffer] if self.buffer.strip() else []
+        self.buffer = ""
+        return chunks
@@ -0,0 +1,112 @@
+import os
+import json
+import hashlib
+import threading
+from logger import logger
+
+# ✅ Root directory for all persistent caches
+CACHE_DIR = os.getenv("MOMIFY_CACHE_DIR", "cache")
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path):
+    """Returns the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_key(*parts):
+    """Builds a cache key from JSON-serializable parts."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class DiskLRUCache:
+    """
+    A JSON value cache stored as one file per key, bounded by total size on disk.
+
+    Recency is tracked through file modification times, so the cache survives restarts
+    and can be shared by several worker processes. When a write pushes the directory over
+    `max_bytes`, the least recently used entries are deleted first.
+    """
+
+    def __init__(self, name, max_bytes):
+        self.name = name
+        self.directory = os.path.join(CACHE_DIR, name)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Returns the cached value for `key`, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # ✅ Mark as recently used
+        except (FileNotFoundError, ValueError):
+            self._count(hit=False, key=key)
+            return None
+
+        self._count(hit=True, key=key)
+        return value
+
+    def put(self, key, value):
+        """Stores `value` under `key` and evicts old entries if over budget."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits in `max_bytes`."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+
+        if removed:
+            logger.info(f"🧹 {self.name} cache evicted {removed} entr{'y' if removed == 1 else 'ies'} "
+                        f"({total / (1024 * 1024):.1f} MB kept)")
+
+    def _count(self, hit, key):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            hits, misses = self.hits, self.misses
+        logger.info(f"{'📦' if hit else '🔍'} {self.name} cache {'hit' if hit else 'miss'} for {key[:12]} "
+                    f"(hits={hits}, misses={misses})")
+
+    def stats(self):
+        return {"name": self.name, "hits": self.hits, "misses": self.misses, "max_bytes": self.max_bytes}
@@ -0,0 +1,77 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from starlette.responses import FileResponse, Response
+
+ETAG_CACHE_SIZE = int(os.getenv("MOMIFY_ETAG_CACHE_SIZE", "1024"))
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# ✅ Outputs never change once written, but revalidating keeps a re-rendered file from being served stale
+CACHE_CONTROL = "private, no-cache"
+
+_etags = OrderedDict()
+_etags_lock = threading.Lock()
+
+
+def file_etag(path, stat_result):
+    """
+    Strong ETag of a file: its SHA-256, hashed once per (path, mtime, size) and then served from memory.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    key = (path, stat_result.st_mtime_ns, stat_result.st_size)
+    with _etags_lock:
+        if key in _etags:
+            _etags.move_to_end(key)
+            return _etags[key]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    etag = f'"{digest.hexdigest()[:32]}"'
+
+    with _etags_lock:
+        _etags[key] = etag
+        while len(_etags) > ETAG_CACHE_SIZE:
+            _etags.popitem(last=False)
+    return etag
+
+
+def etag_matches(if_none_match, etag):
+    """`If-None-Match` uses weak comparison: `W/` prefixes are ignored and `*` matches any file."""
+    if if_none_match is None:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+
+def serve_file(request, path, media_type, filename=None):
+    """
+    Serves a file with a strong ETag, answering `If-None-Match` with `304 Not Modified`.
+
+    `Range` and `If-Range` requests are answered by `FileResponse` with `206 Partial Content`
+    (or `416` when unsatisfiable), validated against the same ETag.
+
+    Args:
+        request (Request): The incoming request.
+        path (str): File to serve.
+        media_type (str): Content type of the file.
+        filename (str): Download name for `Content-Disposition`.
+
+    Returns:
+        Response: The file, a partial response or an empty 304. None when the file does not exist.
+    """
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    etag = file_etag(path, stat_result)
+    headers = {"etag": etag, "cache-control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(path, media_type=media_type, filename=filename, headers=headers, stat_result=stat_result)
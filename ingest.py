@@ -0,0 +1,166 @@
+import os
+import asyncio
+import hashlib
+from logger import logger
+from workspace import JobWorkspace
+
+try:
+    import python_multipart as multipart
+    from python_multipart.multipart import parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    import multipart
+    from multipart.multipart import parse_options_header
+
+# ✅ Upload limit, enforced on the bytes actually received (not only the Content-Length header)
+MAX_UPLOAD_BYTES = int(os.getenv("MOMIFY_MAX_UPLOAD_BYTES", str(1_000_000_000)))
+MAX_FIELD_BYTES = 64 * 1024
+FLUSH_BYTES = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UploadError(Exception):
+    pass
+
+
+class IngestedUpload:
+    """An upload stored in its job workspace, with the form fields sent alongside it."""
+
+    def __init__(self, workspace, file_path, filename, fields, content_hash, size):
+        self.workspace = workspace
+        self.file_path = file_path
+        self.filename = filename
+        self.fields = fields
+        self.content_hash = content_hash
+        self.size = size
+
+
+class _MultipartReceiver:
+    """Callback target for `multipart.MultipartParser`: routes the file part to disk, fields to memory."""
+
+    def __init__(self, file_field, max_bytes):
+        self.file_field = file_field
+        self.max_bytes = max_bytes
+        self.fields = {}
+        self.filename = None
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.pending = bytearray()
+        self._header_field = b""
+        self._header_value = b""
+        self._headers = {}
+        self._part_name = None
+        self._part_is_file = False
+        self._part_value = bytearray()
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+        self._part_value = bytearray()
+
+    def on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._part_name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        self._part_is_file = self._part_name == self.file_field and b"filename" in options
+        if self._part_is_file:
+            self.filename = os.path.basename(options[b"filename"].decode("utf-8", errors="replace"))
+
+    def on_part_data(self, data, start, end):
+        chunk = data[start:end]
+        if self._part_is_file:
+            self.size += len(chunk)
+            if self.size > self.max_bytes:
+                raise UploadTooLarge(f"❌ File too large! Max {self.max_bytes / 1_000_000_000:g}GB allowed.")
+            self.digest.update(chunk)
+            self.pending += chunk
+        else:
+            self._part_value += chunk
+            if len(self._part_value) > MAX_FIELD_BYTES:
+                raise UploadError(f"❌ Form field '{self._part_name}' is too large.")
+
+    def on_part_end(self):
+        if not self._part_is_file:
+            try:
+                self.fields[self._part_name] = self._part_value.decode("utf-8")
+            except UnicodeDecodeError:
+                raise UploadError(f"❌ Form field '{self._part_name}' must be UTF-8 text.")
+
+
+async def ingest_upload(request, file_field="file", max_bytes=MAX_UPLOAD_BYTES):
+    """
+    Streams a multipart upload from the request body straight into a new job workspace.
+
+    The file part is hashed and size-checked as chunks arrive and written to disk in ~1 MB
+    batches off the event loop, so the upload is never held in memory or spooled twice.
+
+    Args:
+        request (Request): The incoming Starlette request.
+        file_field (str): Name of the multipart field carrying the file.
+        max_bytes (int): Maximum accepted file size.
+
+    Returns:
+        IngestedUpload: The stored upload, its SHA-256 and the other form fields.
+
+    Raises:
+        UploadTooLarge: When the file exceeds `max_bytes`.
+        UploadError: When the body is not a multipart upload containing `file_field`.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise UploadError("❌ Expected a multipart/form-data upload.")
+
+    receiver = _MultipartReceiver(file_field, max_bytes)
+    parser = multipart.MultipartParser(boundary, receiver.callbacks())
+    workspace = JobWorkspace.create()
+    # ✅ The extension is only known once the part headers arrive, so write to a neutral name first
+    partial_path = workspace.path("upload.part")
+
+    try:
+        with open(partial_path, "wb") as buffer:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                if len(receiver.pending) >= FLUSH_BYTES:
+                    data, receiver.pending = bytes(receiver.pending), bytearray()
+                    await asyncio.to_thread(buffer.write, data)
+            parser.finalize()
+            if receiver.pending:
+                await asyncio.to_thread(buffer.write, bytes(receiver.pending))
+
+        if receiver.filename is None:
+            raise UploadError(f"❌ No '{file_field}' file found in the upload.")
+
+        extension = os.path.splitext(receiver.filename)[1].lower()
+        os.replace(partial_path, workspace.path(f"input{extension}"))
+        content_hash = receiver.digest.hexdigest()
+        workspace.seal(content_hash)
+    except Exception:
+        workspace.cleanup()
+        raise
+
+    logger.info(f"📥 Ingested {receiver.filename} ({receiver.size / (1024 * 1024):.1f} MB, sha256 {content_hash[:12]})")
+    return IngestedUpload(workspace, workspace.path(f"input{extension}"), receiver.filename,
+                          receiver.fields, content_hash, receiver.size)
@@ -0,0 +1,245 @@
+import os
+import threading
+import time
+import uuid
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from logger import logger
+import telemetry
+from metrics import evaluator
+from mom_store import download_url, profile_url
+
+# ✅ Number of worker processes running pipelines (each holds its own Whisper model)
+JOB_WORKERS = int(os.getenv("MOMIFY_JOB_WORKERS", "2"))
+# ✅ Finished jobs kept in memory for status queries
+JOB_HISTORY = int(os.getenv("MOMIFY_JOB_HISTORY", "500"))
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+TERMINAL_STATES = (COMPLETED, FAILED)
+
+
+class Job:
+    """State and progress events of one pipeline run."""
+
+    def __init__(self, job_id, file_path, options, content_hash=None):
+        self.id = job_id
+        self.file_path = file_path
+        self.options = options
+        self.content_hash = content_hash
+        self.state = QUEUED
+        self.stage = None
+        self.message = None
+        self.progress = None
+        self.result = None
+        self.files = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "stage": self.stage,
+            "message": self.message,
+            "progress": self.progress,
+            "result": self.result,
+            "files": self.files,
+            "downloads": {language: download_url(self.id, language) for language in self.files} if self.files else None,
+            "profile_url": profile_url(self.id) if self.options.get("profile") and self.finished_at else None,
+            "error": self.error,
+            "options": self.options,
+            "content_hash": self.content_hash,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+# ✅ Worker-process side: events travel back to the API process through this queue
+_event_queue = None
+
+
+def _init_worker(event_queue):
+    global _event_queue
+    _event_queue = event_queue
+    telemetry.set_forwarder(lambda name, value, labels: event_queue.put(
+        {"type": "metric", "name": name, "value": value, "labels": labels}))
+    evaluator.set_forwarder(lambda item: event_queue.put({"type": "evaluation", "item": item}))
+
+    import pdf_render
+    pdf_render.warm_up()
+
+    if os.getenv("WHISPER_WARMUP", "1") == "1":
+        import model_registry
+        model_registry.warm_up()
+
+
+def _emit(job_id, event_type, **fields):
+    _event_queue.put({"job_id": job_id, "type": event_type, "time": time.time(), **fields})
+
+
+def _run_job(job_id, file_path, workspace, options):
+    """Runs the full pipeline for one job inside a worker process."""
+    import app
+
+    _emit(job_id, "started", pid=os.getpid())
+    try:
+        files = app.run_pipeline(
+            file_path,
+            emit=lambda event: _emit(job_id, event["type"], **{k: v for k, v in event.items() if k != "type"}),
+            workspace=workspace,
+            **options
+        )
+    except Exception as e:
+        _emit(job_id, FAILED, error=str(e))
+        raise
+
+    # ✅ `result` stays the first language's PDF; `files` maps every requested language to its PDF name
+    _emit(job_id, COMPLETED, result=next(iter(files.values())), files=files)
+    return files
+
+
+def _progress_fields(event):
+    """The measurements of a progress event, without its envelope."""
+    return {key: value for key, value in event.items() if key not in ("job_id", "type", "time", "stage", "message")}
+
+
+class JobManager:
+    """Queues jobs onto a process pool and tracks their state from worker events."""
+
+    def __init__(self, workers=JOB_WORKERS):
+        self.workers = workers
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._event_queue = None
+        self._drain_thread = None
+
+    def start(self):
+        if self._executor is not None:
+            return
+
+        # ✅ Spawn (not fork) so workers never inherit CUDA state or API threads
+        context = multiprocessing.get_context("spawn")
+        self._event_queue = context.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._event_queue,),
+        )
+        self._drain_thread = threading.Thread(target=self._drain_events, name="job-events", daemon=True)
+        self._drain_thread.start()
+        logger.info(f"⚙️ Job pool started with {self.workers} worker process(es).")
+
+    def shutdown(self):
+        if self._executor is None:
+            return
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._event_queue.put(None)
+        self._executor = None
+        logger.info("🛑 Job pool stopped.")
+
+    def submit(self, file_path, workspace=None, content_hash=None, **options):
+        """Queues a pipeline run and returns the new job immediately. The worker removes `workspace` when done."""
+        self.start()
+
+        # ✅ The workspace token doubles as job id, so the outputs of a job are addressable by it
+        job = Job(workspace.token if workspace else uuid.uuid4().hex[:12], file_path, options, content_hash)
+        with self._lock:
+            self._jobs[job.id] = job
+            job.events.append({"type": QUEUED, "time": job.created_at})
+            self._prune()
+
+        future = self._executor.submit(_run_job, job.id, file_path, workspace, options)
+        future.add_done_callback(lambda f, job_id=job.id: self._on_done(job_id, f))
+        logger.info(f"📥 Job {job.id} queued for {os.path.basename(file_path)}")
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def events_since(self, job_id, index):
+        """Returns the job's events after position `index` and whether the job has finished."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return [], True
+        with self._lock:
+            return job.events[index:], job.state in TERMINAL_STATES
+
+    def counts(self):
+        with self._lock:
+            states = [job.state for job in self._jobs.values()]
+        return {state: states.count(state) for state in (QUEUED, RUNNING, COMPLETED, FAILED)}
+
+    def _drain_events(self):
+        while True:
+            event = self._event_queue.get()
+            if event is None:
+                break
+            if event["type"] == "metric":
+                telemetry.apply(event["name"], event["value"], event["labels"])
+            elif event["type"] == "evaluation":
+                evaluator.submit(**event["item"])
+            else:
+                self._apply_event(event)
+
+    def _apply_event(self, event):
+        with self._lock:
+            job = self._jobs.get(event["job_id"])
+            if job is None or job.state in TERMINAL_STATES:
+                return
+
+            event_type = event["type"]
+            if event_type == "started":
+                job.state = RUNNING
+                job.started_at = event["time"]
+            elif event_type == "stage":
+                job.stage = event["stage"]
+                job.message = event["message"]
+                job.progress = _progress_fields(event)
+            elif event_type == "progress":
+                job.progress = _progress_fields(event)
+            elif event_type == COMPLETED:
+                job.state = COMPLETED
+                job.result = event["result"]
+                job.files = event["files"]
+                job.progress = {**(job.progress or {}), "percent": 100.0, "eta_seconds": None}
+                job.finished_at = event["time"]
+            elif event_type == FAILED:
+                job.state = FAILED
+                job.error = event["error"]
+                job.finished_at = event["time"]
+
+            job.events.append({key: value for key, value in event.items() if key != "job_id"})
+
+        if event_type in TERMINAL_STATES:
+            logger.info(f"🏁 Job {job.id} {event_type}.")
+
+    def _on_done(self, job_id, future):
+        # ✅ Covers failures the worker could not report itself (e.g. a crashed process)
+        error = future.exception() if not future.cancelled() else RuntimeError("Job cancelled")
+        if error is None:
+            return
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state in TERMINAL_STATES:
+                return
+            job.state = FAILED
+            job.error = str(error)
+            job.finished_at = time.time()
+            job.events.append({"type": FAILED, "time": job.finished_at, "error": job.error})
+        logger.error(f"❌ Job {job_id} failed: {error}")
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.state in TERMINAL_STATES]
+        for job in sorted(finished, key=lambda j: j.finished_at)[:max(0, len(finished) - JOB_HISTORY)]:
+            del self._jobs[job.id]
@@ -1,5 +1,11 @@
 import logging
+import logging.handlers
 import os
+import json
+import queue
+import atexit
+from collections import deque
+from datetime import datetime, timezone
 
 # Ensure logs directory exists
 LOG_DIR = "logs"
@@ -11,35 +17,133 @@ os.makedirs(EVAL_LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, "momify.log")
 EVAL_LOG_FILE = os.path.join(EVAL_LOG_DIR, "evaluation.log")
 
-# Create a list to store logs for UI
-log_messages = []
+LOG_FORMAT = os.getenv("MOMIFY_LOG_FORMAT", "json")  # "json" (one record per line) or "text" for the log file
+LOG_BUFFER_SIZE = int(os.getenv("MOMIFY_LOG_BUFFER_SIZE", "1000"))
+LOG_QUEUE_SIZE = int(os.getenv("MOMIFY_LOG_QUEUE_SIZE", "10000"))
+TEXT_FORMAT = "%(asctime)s | %(levelname)s | %(message)s"
+
+# ✅ The latest log lines for UI display; older lines fall off instead of accumulating forever
+log_messages = deque(maxlen=LOG_BUFFER_SIZE)
+
 
 # Custom logging handler to capture logs in memory for UI display
 class StreamlitLogHandler(logging.Handler):
     def emit(self, record):
-        log_entry = self.format(record)
-        log_messages.append(log_entry)  # Store logs in a list
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding="utf-8"),  # Save to file
-        logging.StreamHandler(),  # Print to console
-        StreamlitLogHandler()  # Capture logs for UI
-    ]
+        log_messages.append(self.format(record))
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, origin, plus any `extra` fields."""
+
+    RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in self.RESERVED})
+        if record.exc_info or record.exc_text:
+            entry["exception"] = record.exc_text or self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the background writer without blocking the caller.
+
+    When the writer falls `LOG_QUEUE_SIZE` records behind, new records are dropped and
+    counted rather than stalling the request; the count is logged once the queue drains.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # ✅ Render the message once here (arguments may change after the call); keep the record otherwise intact
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            try:
+                self.queue.put_nowait(self.dropped_record(dropped))
+            except queue.Full:
+                self.dropped += dropped
+
+    @staticmethod
+    def dropped_record(count):
+        return logging.makeLogRecord({"name": "MoMify", "levelno": logging.WARNING, "levelname": "WARNING",
+                                      "msg": f"⚠️ Log queue full: {count} record(s) dropped"})
+
+
+def _file_formatter():
+    return JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+
+
+def _only(name):
+    return lambda record: record.name == name
+
+
+# ✅ Callers only enqueue; files, console and the UI buffer are written by one background thread
+log_queue = queue.Queue(LOG_QUEUE_SIZE)
+queue_handler = DroppingQueueHandler(log_queue)
+
+file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")  # Save to file
+file_handler.setFormatter(_file_formatter())
+console_handler = logging.StreamHandler()  # Print to console
+console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+ui_handler = StreamlitLogHandler()  # Capture logs for UI
+ui_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+# ✅ Configure Evaluation Logger (Metrics & Performance): its own file, and the main log as before
+eval_handler = logging.FileHandler(EVAL_LOG_FILE, encoding="utf-8")
+eval_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+eval_handler.addFilter(_only("EvaluationLogger"))
+
+listener = logging.handlers.QueueListener(
+    log_queue, file_handler, console_handler, ui_handler, eval_handler, respect_handler_level=True
 )
+listener.start()
+
+
+@atexit.register
+def stop_logging():
+    """Flushes queued records to the handlers; safe to call more than once."""
+    if listener._thread is None:
+        return
+    # ✅ Blocking puts: the final drop count and the stop sentinel must get in even when the queue is full
+    if queue_handler.dropped:
+        dropped, queue_handler.dropped = queue_handler.dropped, 0
+        log_queue.put(queue_handler.dropped_record(dropped))
+    log_queue.put(listener._sentinel)
+    listener._thread.join()
+    listener._thread = None
+
+
+logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
 
 # Create a logger instance
 logger = logging.getLogger("MoMify")
 
-# ✅ Configure Evaluation Logger (Metrics & Performance)
 eval_logger = logging.getLogger("EvaluationLogger")
-eval_handler = logging.FileHandler(EVAL_LOG_FILE, encoding="utf-8")
-eval_formatter = logging.Formatter("%(asctime)s | %(levelname)s | %(message)s")
-eval_handler.setFormatter(eval_formatter)
-eval_logger.addHandler(eval_handler)
 eval_logger.setLevel(logging.INFO)
 
 
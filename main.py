@@ -1,206 +1,311 @@
 import os
-import whisper
-from moviepy.video.io.VideoFileClip import VideoFileClip
-from langchain_openai import ChatOpenAI
-from langchain.schema import SystemMessage, HumanMessage
-from fpdf import FPDF
-from pydub import AudioSegment
-
+import json
 import time
-from tqdm import tqdm
-import torch
-import tiktoken
+import argparse
+import threading
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+from logger import logger
+import app
+from metrics import evaluator
+from disk_cache import make_key
+from mom_store import MoMStore, OUTPUT_DIR, validate_style, download_name
+from audio_decode import VIDEO_EXTENSIONS, AUDIO_EXTENSIONS
+from parallel_asr import ASR_THREADS_PER_WORKER
 
 # ✅ Load API key from .env
 load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-# Hardcoded file path
-FILE_PATH = "inputs/meeting-short.mp4"
 
-def count_tokens(text, model="gpt-4"):
-    """Returns the number of tokens in a string using OpenAI's tokenizer."""
-    enc = tiktoken.encoding_for_model(model)
-    return len(enc.encode(text))
-
-def split_text_into_chunks(text, max_tokens=7500):
-    """Splits long text into smaller chunks while preserving sentence structure."""
-    words = text.split()
-    chunks = []
-    current_chunk = []
-    current_token_count = 0
-
-    for word in words:
-        word_token_count = count_tokens(word)
-        if current_token_count + word_token_count > max_tokens:
-            chunks.append(" ".join(current_chunk))
-            current_chunk = []
-            current_token_count = 0
-        current_chunk.append(word)
-        current_token_count += word_token_count
-
-    if current_chunk:
-        chunks.append(" ".join(current_chunk))
-
-    return chunks
-
-# ✅ Extract audio from video
-def extract_audio(file_path):
-    audio_path = "inputs/extracted_audio.wav"  # Output file in WAV format
-
-    file_extension = os.path.splitext(file_path)[1].lower()  # Get file extension
-
-    print(f"\nProcessing file: {file_path} (Type: {file_extension})")
-
-    # ✅ If it's a video file, extract audio using MoviePy
-    if file_extension in [".mp4", ".mov", ".avi", ".mkv", ".webm"]:
-        print("🎥 Detected video file. Extracting audio...")
-        video = VideoFileClip(file_path)
-
-        if not video.audio:
-            raise ValueError("❌ No audio found in the video file!")
-
-        video.audio.write_audiofile(audio_path, codec="pcm_s16le")
-
-    # ✅ If it's an audio file, convert it to WAV using Pydub
-    elif file_extension in [".wav", ".mp3", ".m4a", ".wma", ".aac", ".flac", ".ogg"]:
-        print("🎵 Detected audio file. Converting to WAV...")
-        audio = AudioSegment.from_file(file_path)
-        audio.export(audio_path, format="wav")
-
-    else:
-        raise ValueError(f"❌ Unsupported file format: {file_extension}")
-
-    print(f"✅ Audio saved to {audio_path}")
-    return audio_path
-
-# ✅ Transcribe audio using OpenAI Whisper
-def transcribe_audio(audio_path):
-    if not torch.cuda.is_available():
-        print("⚠️ Warning: No GPU detected, running on CPU. This will be slower!")
-
-    print("\nLoading Whisper model...")
-    model = whisper.load_model("medium")
-
-    # Move model to GPU
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    model = model.to(device)
-
-    print(f"✅ Model is running on: {device}")  # Debugging print
-
-    result = model.transcribe(audio_path)
-    return result["text"]
-
-# ✅ Summarize transcription using GPT-4 in MoM Format
-def summarize_text(transcription):
-    """Handles long transcripts by splitting them into smaller chunks and summarizing each separately."""
-    print("\nGenerating Minutes of Meeting...")
-
-    transcript_chunks = split_text_into_chunks(transcription)
-    print(f"📌 Transcript split into {len(transcript_chunks)} chunks.")
-
-    llm = ChatOpenAI(
-        model_name="gpt-4",
-        temperature=0,
-        openai_api_key=OPENAI_API_KEY
-    )
-
-    summarized_chunks = []
-
-    for i, chunk in enumerate(transcript_chunks):
-        print(f"\n📌 Summarizing Chunk {i+1}/{len(transcript_chunks)}...")
-        messages = [
-            SystemMessage(content="You are an AI that converts meeting transcripts into structured Minutes of Meeting (MoM)."),
-            HumanMessage(content=f"Summarize this part of a meeting transcript:\n\n{chunk}")
-        ]
-        summary = llm.invoke(messages)
-        summarized_chunks.append(summary.content)
-
-    print("\n📌 Merging summarized chunks into final MoM...")
-    messages = [
-        SystemMessage(content="You are an AI that creates professional Minutes of Meeting."),
-        HumanMessage(
-            content="Combine these meeting summaries into a structured MoM:\n\n" + "\n\n".join(summarized_chunks) +
-                    "\n\nFormat it with:\n"
-                    "1. **Meeting Title**\n"
-                    "2. **Date & Time**\n"
-                    "3. **Attendees** (List of Participants)\n"
-                    "4. **Agenda**\n"
-                    "5. **Discussion Points**\n"
-                    "6. **Action Items**\n"
-                    "7. **Next Meeting Date (if applicable)**\n\n"
-                    "Ensure it's concise, clear, and professional.")
-    ]
-    final_summary = llm.invoke(messages)
-
-    return final_summary.content
-
-# ✅ Export summary to PDF in MoM format
-def export_to_pdf(summary, output_filename="outputs/Meeting_Minutes.pdf"):
-    os.makedirs("outputs", exist_ok=True)  # Ensure output folder exists
-
-    print("\nExporting summary to PDF...")
-    for _ in tqdm(range(100), desc="Saving PDF", unit="%"):
-        time.sleep(0.01)
-
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-
-    # ✅ Meeting Title
-    pdf.set_font("Arial", "B", 20)
-    pdf.cell(200, 10, "MEETING MINUTES", ln=True, align='C')
-    pdf.ln(5)
-
-    # ✅ Subtitle (Meeting Type)
-    pdf.set_font("Arial", "B", 14)
-    pdf.cell(200, 8, "ADMIN MEETING", ln=True, align='C')
-    pdf.ln(5)
-
-    # ✅ Horizontal Line
-    pdf.set_draw_color(0, 128, 0)  # Green color
-    pdf.set_line_width(1)
-    pdf.line(10, pdf.get_y(), 200, pdf.get_y())
-    pdf.ln(8)
-
-    # ✅ Process Summary Sections
-    sections = summary.split("\n\n")  # Split sections
-
-    for section in sections:
-        if "**" in section:  # If section has a heading
-            section = section.replace("**", "").strip()  # Remove Markdown bold
-            pdf.set_font("Arial", "B", 12)  # ✅ Bold for headings
-            pdf.multi_cell(0, 8, section)  # Print heading
-            pdf.ln(2)  # Small space after heading
+# ✅ Batch defaults: Whisper processes (CPU-bound) and concurrent LLM pipelines (I/O-bound)
+BATCH_ASR_WORKERS = int(os.getenv("MOMIFY_BATCH_ASR_WORKERS", "2"))
+BATCH_LLM_WORKERS = int(os.getenv("MOMIFY_BATCH_LLM_WORKERS", "8"))
+BATCH_DIR = os.path.join(OUTPUT_DIR, "batch")
+
+DONE = "done"
+FAILED = "failed"
+
+
+### **🔹 Inputs**
+class BatchItem:
+    """
+    One recording of a batch with the options it is processed with.
+
+    Raises:
+        InvalidStyle: When the font or color cannot be rendered, so a bad option fails before transcription.
+    """
+
+    def __init__(self, path, languages=("en",), font="Arial", color="000000"):
+        self.path = os.path.abspath(path)
+        self.languages = list(languages)
+        self.font, self.color = validate_style(font, color)
+        # ✅ Stable across runs, so a rerun recognises finished recordings; changes when the file or options do
+        stat = os.stat(self.path)
+        self.job_id = make_key(self.path, stat.st_size, stat.st_mtime_ns, self.languages, self.font, self.color)[:12]
+
+    def to_dict(self):
+        return {"path": self.path, "job_id": self.job_id, "languages": self.languages,
+                "font": self.font, "color": self.color}
+
+
+def collect_items(source, languages, font, color):
+    """
+    Lists the recordings to process.
+
+    Args:
+        source (str): A directory (searched recursively for supported audio and video files) or a
+            manifest file with one path per line. Manifest lines may instead be JSON objects with
+            `path` and optional `language`, `font` and `color`; relative paths are resolved against
+            the manifest's directory.
+        languages (list[str]): Default MoM languages.
+        font (str): Default PDF font.
+        color (str): Default HEX color for headers.
+
+    Returns:
+        list[BatchItem]: The recordings, in directory or manifest order. Manifest lines naming a
+        missing file or an unsupported language, font or color are logged and skipped.
+    """
+    if os.path.isdir(source):
+        extensions = set(VIDEO_EXTENSIONS) | set(AUDIO_EXTENSIONS)
+        paths = sorted(
+            os.path.join(directory, name)
+            for directory, _, names in os.walk(source)
+            for name in names if os.path.splitext(name)[1].lower() in extensions
+        )
+        return [BatchItem(path, languages, font, color) for path in paths]
+
+    items = []
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = json.loads(line) if line.startswith("{") else {"path": line}
+            path = os.path.join(base, entry["path"])
+            if not os.path.isfile(path):
+                logger.warning(f"⚠️ Manifest line {number}: {entry['path']} not found, skipped.")
+                continue
+            try:
+                items.append(BatchItem(
+                    path,
+                    app.parse_languages(entry.get("language", languages)),
+                    entry.get("font", font),
+                    entry.get("color", color),
+                ))
+            except ValueError as e:  # ✅ InvalidStyle or an unsupported language
+                logger.warning(f"⚠️ Manifest line {number}: {e} Skipped.")
+    return items
+
+
+### **🔹 Resumable State**
+class BatchJournal:
+    """
+    Append-only JSON-lines record of finished recordings.
+
+    Each result is flushed to disk as soon as it is known, so after a crash a rerun with the same
+    journal skips everything already done and redoes only what was in flight.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.results = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        result = json.loads(line)
+                    except ValueError:
+                        continue  # ✅ A line cut short by a crash
+                    self.results[result["job_id"]] = result
+        except FileNotFoundError:
+            pass
+
+    def is_done(self, item, mom_store):
+        result = self.results.get(item.job_id)
+        return bool(result and result["status"] == DONE and all(
+            os.path.exists(mom_store.pdf_path(item.job_id, language)) for language in item.languages))
+
+    def record(self, result):
+        with self._lock:
+            self.results[result["job_id"]] = result
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+### **🔹 Pipeline Stages**
+def _init_asr_worker(threads):
+    import torch
+    torch.set_num_threads(threads)
+    # ✅ Files already run in parallel; one Whisper pass per process avoids nesting process pools
+    app.TRANSCRIBE_MODE = "serial"
+    app.model_registry.warm_up([app.model_registry.DEFAULT_MODEL_SIZE])
+
+
+def transcribe_file(path):
+    """
+    Decodes and transcribes one recording in an ASR worker process.
+
+    Returns:
+        dict: `transcript` plus the `decode_seconds`, `transcribe_seconds` and `audio_seconds` of the file.
+    """
+    start = time.perf_counter()
+    audio = app.extract_audio(path)
+    decoded = time.perf_counter()
+    transcript = app.transcribe_audio_with_retry(audio)
+    return {
+        "transcript": transcript,
+        "audio_seconds": round(audio.size / app.SAMPLE_RATE, 1),
+        "decode_seconds": round(decoded - start, 2),
+        "transcribe_seconds": round(time.perf_counter() - decoded, 2),
+    }
+
+
+def summarize_file(item, transcript):
+    """
+    Summarizes one transcript and renders its PDFs in the calling (LLM pool) thread.
+
+    Returns:
+        dict: The PDF name per language plus `summarize_seconds` and `pdf_seconds`.
+    """
+    start = time.perf_counter()
+    summaries = app.summarize_text_with_retry(transcript, item.languages)
+    documents = app.store_documents(summaries, item.job_id, item.font, item.color)
+    summarized = time.perf_counter()
+    app.submit_evaluations(documents, item.job_id, summarized - start)
+    files = {
+        language: app.export_pdf_with_retry(documents[language], download_name(item.job_id, language),
+                                            item.font, item.color, language, item.job_id)
+        for language in item.languages
+    }
+    return {"files": files, "summarize_seconds": round(summarized - start, 2),
+            "pdf_seconds": round(time.perf_counter() - summarized, 2)}
+
+
+### **🔹 Batch Runner**
+def run_batch(items, journal, asr_workers=BATCH_ASR_WORKERS, llm_workers=BATCH_LLM_WORKERS, force=False):
+    """
+    Runs every recording through transcription on a process pool and summarization on a thread pool.
+
+    A recording moves to the LLM pool as soon as its transcript is ready, so Whisper keeps decoding the
+    next files while earlier ones are summarized. Every result is recorded in `journal` when it is known.
+
+    Args:
+        items (list[BatchItem]): The recordings.
+        journal (BatchJournal): Finished recordings; those done earlier are skipped unless `force`.
+        asr_workers (int): Whisper processes.
+        llm_workers (int): Recordings summarized concurrently.
+        force (bool): Reprocess recordings the journal already lists as done.
+
+    Returns:
+        list[dict]: One result per item, in input order, with its status and per-stage timings.
+    """
+    mom_store = MoMStore()
+    results = {}
+    pending = []
+    for item in items:
+        if not force and journal.is_done(item, mom_store):
+            results[item.job_id] = {**journal.results[item.job_id], "status": "skipped"}
         else:
-            pdf.set_font("Arial", "", 12)  # ✅ Normal font for body text
-            pdf.multi_cell(0, 8, section)  # Print body text
-            pdf.ln(4)  # Space between paragraphs
-
-    # ✅ Attempt to Save the PDF Safely
-    max_attempts = 5  # Retry up to 5 times
-    for attempt in range(max_attempts):
+            pending.append(item)
+    logger.info(f"📦 Batch: {len(items)} file(s), {len(items) - len(pending)} already done, {len(pending)} to process.")
+
+    def finish(item, status, **fields):
+        # ✅ Time spent on the file itself; waiting for a free worker is not counted
+        total = sum(value for key, value in fields.items() if key.endswith("_seconds") and key != "audio_seconds")
+        result = {**item.to_dict(), "status": status, "total_seconds": round(total, 2),
+                  "finished_at": time.time(), **fields}
+        journal.record(result)
+        results[item.job_id] = result
+        logger.info(f"{'✅' if status == DONE else '❌'} [{len(results)}/{len(items)}] "
+                    f"{os.path.basename(item.path)}: {status} in {result['total_seconds']}s")
+
+    def summarize(item, asr):
+        transcript = asr.pop("transcript")
         try:
-            pdf.output(output_filename)
-            print(f"✅ Minutes of Meeting saved to {output_filename}")
-            return
-        except PermissionError:
-            print(f"⚠️ File '{output_filename}' is open. Close it and retrying ({attempt + 1}/{max_attempts})...")
-            time.sleep(2)  # Wait before retrying
+            finish(item, DONE, **asr, **summarize_file(item, transcript))
+        except Exception as e:
+            finish(item, FAILED, **asr, error=f"summarize: {e}")
+
+    if pending:
+        # ✅ Spawn (not fork) so Whisper workers never inherit CUDA state or the LLM pool's threads
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=asr_workers, mp_context=context, initializer=_init_asr_worker,
+                                 initargs=(ASR_THREADS_PER_WORKER,)) as asr_pool, \
+                ThreadPoolExecutor(max_workers=llm_workers, thread_name_prefix="momify-batch-llm") as llm_pool:
+            transcriptions = {asr_pool.submit(transcribe_file, item.path): item for item in pending}
+            summaries = []
+            for future in as_completed(transcriptions):
+                item = transcriptions[future]
+                try:
+                    asr = future.result()
+                except Exception as e:
+                    finish(item, FAILED, error=f"transcribe: {e}")
+                    continue
+                summaries.append(llm_pool.submit(summarize, item, asr))
+            for future in summaries:
+                future.result()
+
+    return [results[item.job_id] for item in items]
+
+
+def write_report(results, path, wall_seconds, asr_workers, llm_workers):
+    """Writes the batch report (totals plus one entry per file) as JSON and returns it."""
+    processed = [result for result in results if result["status"] in (DONE, FAILED)]
+    audio_seconds = sum(result.get("audio_seconds", 0) for result in processed if result["status"] == DONE)
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "asr_workers": asr_workers,
+        "llm_workers": llm_workers,
+        "wall_seconds": round(wall_seconds, 1),
+        "files": len(results),
+        "done": sum(result["status"] == DONE for result in results),
+        "skipped": sum(result["status"] == "skipped" for result in results),
+        "failed": sum(result["status"] == FAILED for result in results),
+        "audio_hours_processed": round(audio_seconds / 3600, 2),
+        "audio_seconds_per_wall_second": round(audio_seconds / wall_seconds, 2) if wall_seconds else None,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
 
-    print(f"❌ Failed to save PDF. Make sure '{output_filename}' is closed and try again.")
 
 # ✅ Run the script
 if __name__ == "__main__":
-    if not os.path.exists(FILE_PATH):
-        print(f"❌ Error: File '{FILE_PATH}' not found!")
-    else:
-        print("\n🚀 Starting the process...")
-
-        audio_path = extract_audio(FILE_PATH)
-        transcription = transcribe_audio(audio_path)
-        summary = summarize_text(transcription)
-        export_to_pdf(summary)
-
-        print("\n✅ Process complete!")
+    parser = argparse.ArgumentParser(description="Generate MoM PDFs for a directory or manifest of recordings.")
+    parser.add_argument("source", help="directory of recordings, or a manifest (one path or JSON object per line)")
+    parser.add_argument("--language", default="en", help="MoM language code(s), comma-separated")
+    parser.add_argument("--font", default="Arial")
+    parser.add_argument("--color", default="000000")
+    parser.add_argument("--asr-workers", type=int, default=BATCH_ASR_WORKERS, help="Whisper processes")
+    parser.add_argument("--llm-workers", type=int, default=BATCH_LLM_WORKERS, help="recordings summarized at once")
+    parser.add_argument("--journal", default=os.path.join(BATCH_DIR, "journal.jsonl"),
+                        help="resume state; finished recordings listed here are skipped")
+    parser.add_argument("--report", help="report path (default: outputs/batch/report_<timestamp>.json)")
+    parser.add_argument("--force", action="store_true", help="reprocess recordings that are already done")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        parser.error(f"❌ '{args.source}' not found!")
+    try:
+        languages = app.parse_languages(args.language)
+        validate_style(args.font, args.color)
+    except ValueError as e:
+        parser.error(str(e))
+
+    batch_start = time.perf_counter()
+    items = collect_items(args.source, languages, args.font, args.color)
+    results = run_batch(items, BatchJournal(args.journal), args.asr_workers, args.llm_workers, args.force)
+    evaluator.close()
+
+    report_path = args.report or os.path.join(BATCH_DIR, f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    report = write_report(results, report_path, time.perf_counter() - batch_start, args.asr_workers, args.llm_workers)
+    logger.info(f"📊 Batch finished: {report['done']} done, {report['skipped']} skipped, {report['failed']} failed "
+                f"in {report['wall_seconds']}s. Report: {report_path}")
@@ -1,63 +1,267 @@
+import os
+import time
+import queue
+import sqlite3
+import argparse
+import threading
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
 import textstat
-from logger import eval_logger
+from logger import eval_logger, EVAL_LOG_DIR
+from mom_store import MoMStore, OUTPUT_DIR
 
-def format_processing_time(processing_time):
+# ✅ Structured evaluation results: one row per job and language, queryable for quality trends
+EVAL_DB = os.getenv("MOMIFY_EVAL_DB", os.path.join(EVAL_LOG_DIR, "evaluations.sqlite3"))
+EVAL_QUEUE_SIZE = int(os.getenv("MOMIFY_EVAL_QUEUE_SIZE", "1000"))
+EVAL_BATCH_SIZE = int(os.getenv("MOMIFY_EVAL_BATCH_SIZE", "50"))
+EVAL_WORKERS = int(os.getenv("MOMIFY_EVAL_WORKERS", str(os.cpu_count() or 1)))
+
+
+def _flesch_reading_ease(text):
+    return textstat.flesch_reading_ease(text) + 50
+
+
+# ✅ Readability scores stored per summary (column name → scorer)
+READABILITY_SCORES = {
+    "flesch_reading_ease": _flesch_reading_ease,
+    "smog_index": textstat.smog_index,
+    "gunning_fog": textstat.gunning_fog,
+    "dale_chall": textstat.dale_chall_readability_score,
+    "ari": textstat.automated_readability_index,
+}
+
+COLUMNS = ("job_id", "language", "source", "scored_at", "words", "processing_seconds") + tuple(READABILITY_SCORES)
+
+def score_readability(summary_text):
     """
-    Formats the processing time into a readable format.
-    - Shows only seconds if less than 1 minute.
-    - Shows minutes and seconds if 1 minute or more.
+    Computes every score in `READABILITY_SCORES` for one text.
+
+    Returns:
+        dict: Score per column name; all None when the text cannot be scored.
     """
-    total_seconds = int(processing_time * 60)
-    minutes = total_seconds // 60
-    seconds = total_seconds % 60
+    try:
+        return {name: scorer(summary_text) for name, scorer in READABILITY_SCORES.items()}
+    except Exception as e:
+        eval_logger.error(f"❌ Error calculating readability scores: {e}")
+        return dict.fromkeys(READABILITY_SCORES)
 
-    if minutes > 0:
-        return f"{minutes} min {seconds} sec"
-    else:
-        return f"{seconds} sec"
+def evaluate(job_id, language, text, processing_seconds=None, source="pipeline"):
+    """Scores one summary and returns its `EvaluationStore` row."""
+    return {
+        "job_id": job_id,
+        "language": language,
+        "source": source,
+        "scored_at": time.time(),
+        "words": len(text.split()),
+        "processing_seconds": processing_seconds,
+        **score_readability(text),
+    }
+
+
+class EvaluationStore:
+    """
+    Readability scores in SQLite, one row per job and language.
 
-def log_evaluation_metrics(summary_text, start_time, end_time):
+    Every call opens its own connection, so the evaluator thread, batch runs and API requests can
+    use the store at the same time; WAL mode lets readers proceed while a batch is being written.
     """
-    Logs multiple readability scores and processing time for evaluation.
+
+    def __init__(self, path=EVAL_DB):
+        self.path = path
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS evaluations (job_id TEXT, language TEXT, source TEXT, scored_at REAL, "
+            "words INTEGER, processing_seconds REAL, "
+            + ", ".join(f"{name} REAL" for name in READABILITY_SCORES)
+            + ", UNIQUE (job_id, language))"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS evaluations_scored_at ON evaluations (scored_at)")
+        return connection
+
+    def record(self, rows):
+        """Inserts or replaces rows; a rescore keeps the processing time recorded by the pipeline."""
+        if not rows:
+            return
+        updates = ", ".join(f"{name} = excluded.{name}" for name in COLUMNS[2:] if name != "processing_seconds")
+        with self._connect() as connection:
+            connection.executemany(
+                f"INSERT INTO evaluations ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+                f"ON CONFLICT (job_id, language) DO UPDATE SET {updates}, "
+                "processing_seconds = COALESCE(excluded.processing_seconds, evaluations.processing_seconds)",
+                [tuple(row[name] for name in COLUMNS) for row in rows],
+            )
+        connection.close()
+
+    def scored(self):
+        """The `(job_id, language)` pairs that already have a row."""
+        with self._connect() as connection:
+            pairs = set(connection.execute("SELECT job_id, language FROM evaluations"))
+        connection.close()
+        return pairs
+
+    def trend(self, days=30, language=None):
+        """
+        Daily averages of every score over the last `days` days.
+
+        Returns:
+            list[dict]: One entry per day (oldest first) with `day`, `summaries`, `words` and each score.
+        """
+        query = (
+            "SELECT date(scored_at, 'unixepoch') AS day, COUNT(*), AVG(words), AVG(processing_seconds), "
+            + ", ".join(f"AVG({name})" for name in READABILITY_SCORES)
+            + " FROM evaluations WHERE scored_at >= ?"
+        )
+        parameters = [time.time() - days * 86400]
+        if language:
+            query += " AND language = ?"
+            parameters.append(language)
+        query += " GROUP BY day ORDER BY day"
+
+        with self._connect() as connection:
+            rows = connection.execute(query, parameters).fetchall()
+        connection.close()
+        names = ("day", "summaries", "words", "processing_seconds") + tuple(READABILITY_SCORES)
+        return [dict(zip(names, row)) for row in rows]
+
+
+class BackgroundEvaluator:
+    """
+    Scores finished summaries off the pipeline's critical path.
+
+    `submit` only enqueues; one background thread scores queued summaries and writes them to the
+    store in batches. In job worker processes, `set_forwarder` hands submissions to the API process
+    (as telemetry does), so a single evaluator owns the store.
+    """
+
+    def __init__(self, store, batch_size=EVAL_BATCH_SIZE, queue_size=EVAL_QUEUE_SIZE):
+        self.store = store
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._queue = queue.Queue(queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._forward = None
+
+    def set_forwarder(self, forward):
+        """Routes every submission to `forward(item)` instead of the local queue."""
+        self._forward = forward
+
+    def submit(self, job_id, language, text, processing_seconds=None, source="pipeline"):
+        """Queues one summary for scoring; never blocks (the summary is dropped if the queue is full)."""
+        item = {"job_id": job_id, "language": language, "text": text,
+                "processing_seconds": processing_seconds, "source": source}
+        if self._forward is not None:
+            self._forward(item)
+            return
+
+        self._start()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            eval_logger.warning(f"⚠️ Evaluation queue full: summary of job {job_id} ({language}) not scored")
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="evaluator", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                stop = True
+                batch = [item for item in batch if item is not None]
+
+            try:
+                self.store.record([evaluate(**item) for item in batch])
+            except Exception as e:
+                eval_logger.error(f"❌ Could not store {len(batch)} evaluation(s): {e}")
+
+    def close(self):
+        """Scores whatever is still queued and stops the thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+
+evaluation_store = EvaluationStore()
+evaluator = BackgroundEvaluator(evaluation_store)
+
+
+### **🔹 Batch Scoring of Stored Summaries**
+def _evaluate_stored(job_id, language, root):
+    document, _ = MoMStore(root).load(job_id, language)
+    if document is None:
+        return None
+    return evaluate(job_id, language, document.plain_text(), source="batch")
+
+
+def evaluate_stored(store=evaluation_store, root=OUTPUT_DIR, workers=EVAL_WORKERS, rescore=False):
+    """
+    Scores every MoM kept in the `MoMStore` at `root` across `workers` processes.
 
     Args:
-        summary_text (str): The generated summary.
-        start_time (float): Timestamp when processing started.
-        end_time (float): Timestamp when processing ended.
+        store (EvaluationStore): Where the scores are written.
+        root (str): The outputs directory holding the stored documents.
+        workers (int): Scoring processes.
+        rescore (bool): Also rescore summaries that already have a row.
 
     Returns:
-        dict: Dictionary containing readability scores and processing time.
+        int: Number of summaries scored.
     """
-    # ✅ Compute Readability Scores
-    try:
-        flesch_reading_ease = textstat.flesch_reading_ease(summary_text) + 50
-        smog_index = textstat.smog_index(summary_text)
-        gunning_fog = textstat.gunning_fog(summary_text)
-        dale_chall = textstat.dale_chall_readability_score(summary_text)
-        ari = textstat.automated_readability_index(summary_text)
+    workers = max(1, workers)
+    mom_store = MoMStore(root)
+    done = set() if rescore else store.scored()
+    pending = [(job_id, language) for job_id in mom_store.jobs() for language in mom_store.languages(job_id)
+               if (job_id, language) not in done]
+    if not pending:
+        return 0
 
-    except Exception as e:
-        eval_logger.error(f"❌ Error calculating readability scores: {e}")
-        flesch_reading_ease = smog_index = gunning_fog = dale_chall = ari = None
+    start = time.perf_counter()
+    scored = 0
+    batch = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        job_ids, languages = zip(*pending)
+        chunksize = max(1, min(64, len(pending) // (workers * 4)))
+        for row in pool.map(_evaluate_stored, job_ids, languages, repeat(root), chunksize=chunksize):
+            if row is not None:
+                batch.append(row)
+            if len(batch) >= EVAL_BATCH_SIZE * 10:
+                store.record(batch)
+                scored += len(batch)
+                batch = []
+    store.record(batch)
+    scored += len(batch)
 
-    # ✅ Compute Processing Time (in minutes)
-    processing_time = (end_time - start_time) / 60
-    formatted_time = format_processing_time(processing_time)
+    eval_logger.info(f"📊 Scored {scored} stored summaries with {workers} worker(s) in {time.perf_counter() - start:.1f}s")
+    return scored
 
-    # ✅ Log evaluation results
-    eval_logger.info(f"📊 Readability Metrics:")
-    eval_logger.info(f"   - Flesch Reading Ease: {flesch_reading_ease if flesch_reading_ease is not None else 'N/A'}")
-    eval_logger.info(f"   - SMOG Index: {smog_index if smog_index is not None else 'N/A'}")
-    eval_logger.info(f"   - Gunning Fog: {gunning_fog if gunning_fog is not None else 'N/A'}")
-    eval_logger.info(f"   - Dale-Chall Readability: {dale_chall if dale_chall is not None else 'N/A'}")
-    eval_logger.info(f"   - Automated Readability Index (ARI): {ari if ari is not None else 'N/A'}")
-    eval_logger.info(f"⏳ Processing Time: {formatted_time}")
 
-    return {
-        "Flesch Reading Ease": flesch_reading_ease,
-        "SMOG Index": smog_index,
-        "Gunning Fog": gunning_fog,
-        "Dale-Chall Readability": dale_chall,
-        "Automated Readability Index": ari,
-        "Processing Time": formatted_time
-    }
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score stored MoM summaries and show readability trends.")
+    parser.add_argument("--root", default=OUTPUT_DIR, help="outputs directory with the stored MoMs")
+    parser.add_argument("--workers", type=int, default=EVAL_WORKERS)
+    parser.add_argument("--rescore", action="store_true", help="rescore summaries that already have scores")
+    parser.add_argument("--trend", type=int, metavar="DAYS", help="print daily averages instead of scoring")
+    parser.add_argument("--language")
+    args = parser.parse_args()
+
+    if args.trend:
+        for day in evaluation_store.trend(args.trend, args.language):
+            print(day)
+    else:
+        print(f"Scored {evaluate_stored(root=args.root, workers=args.workers, rescore=args.rescore)} summaries.")
@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+import torch
+import whisper
+from logger import logger
+
+# ✅ Whisper model sizes kept resident in this process (comma-separated, e.g. "medium,small")
+WHISPER_MODEL_SIZES = [size.strip() for size in os.getenv("WHISPER_MODELS", "medium").split(",") if size.strip()]
+DEFAULT_MODEL_SIZE = os.getenv("WHISPER_DEFAULT_MODEL", WHISPER_MODEL_SIZES[0])
+
+
+def default_device():
+    """Returns the device new models are placed on."""
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+class LoadedModel:
+    """A resident Whisper model together with its load statistics and usage lock."""
+
+    def __init__(self, size, device, model, load_seconds, memory_bytes):
+        self.size = size
+        self.device = device
+        self.model = model
+        self.load_seconds = load_seconds
+        self.memory_bytes = memory_bytes
+        self.loaded_at = time.time()
+        self.uses = 0
+        # Whisper installs decoder hooks per transcribe() call, so one call at a time per model
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        self.lock.acquire()
+        self.uses += 1
+        return self.model
+
+    def __exit__(self, exc_type, exc, tb):
+        self.lock.release()
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "device": self.device,
+            "load_seconds": round(self.load_seconds, 3),
+            "memory_mb": round(self.memory_bytes / (1024 * 1024), 1),
+            "loaded_at": self.loaded_at,
+            "uses": self.uses,
+            "busy": self.lock.locked(),
+        }
+
+
+_models = {}
+_load_locks = {}
+_registry_lock = threading.Lock()
+
+
+def _model_memory_bytes(model):
+    """Returns the memory held by the model's parameters and buffers."""
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def get_model(size=None, device=None):
+    """
+    Returns the resident Whisper model for `size` on `device`, loading it on first use.
+
+    Args:
+        size (str): Whisper model size (defaults to `DEFAULT_MODEL_SIZE`).
+        device (str): Torch device (defaults to CUDA when available, otherwise CPU).
+
+    Returns:
+        LoadedModel: The shared model entry. Use it as a context manager while transcribing.
+    """
+    size = size or DEFAULT_MODEL_SIZE
+    device = device or default_device()
+    key = (size, device)
+
+    entry = _models.get(key)
+    if entry is not None:
+        return entry
+
+    with _registry_lock:
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+
+    # ✅ Per-key lock: concurrent callers wait for a single load instead of loading twice
+    with load_lock:
+        entry = _models.get(key)
+        if entry is not None:
+            return entry
+
+        if device == "cpu":
+            logger.warning("⚠️ No GPU detected, running on CPU. This may be slower.")
+
+        logger.info(f"📦 Loading Whisper model '{size}' on {device}...")
+        start_time = time.time()
+        model = whisper.load_model(size, device=device)
+        load_seconds = time.time() - start_time
+
+        entry = LoadedModel(size, device, model, load_seconds, _model_memory_bytes(model))
+        _models[key] = entry
+        logger.info(f"✅ Whisper model '{size}' loaded on {device} in {load_seconds:.1f}s "
+                    f"({entry.memory_bytes / (1024 * 1024):.0f} MB)")
+        return entry
+
+
+def warm_up(sizes=None, device=None):
+    """Loads every configured model size so the first request does not pay the load time."""
+    for size in sizes or WHISPER_MODEL_SIZES:
+        try:
+            get_model(size, device)
+        except Exception as e:
+            logger.error(f"❌ Failed to warm up Whisper model '{size}': {e}")
+
+
+def registry_stats():
+    """Returns load time and memory for every resident model."""
+    return {
+        "configured": WHISPER_MODEL_SIZES,
+        "default": DEFAULT_MODEL_SIZE,
+        "models": [entry.stats() for entry in list(_models.values())],
+    }
@@ -0,0 +1,260 @@
+import re
+import json
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+SCHEMA_VERSION = 2
+
+# ✅ Canonical section keys, in the order the merge prompt asks for them
+SECTION_KEYS = [
+    "title", "date_time", "attendees", "agenda",
+    "discussion_points", "action_items", "conclusion", "next_meeting",
+]
+
+# ✅ Section headers the merge prompt uses for each language (same order as SECTION_KEYS)
+SECTION_TITLES = {
+    "en": ["Meeting Title:", "Date & Time:", "Attendees:", "Agenda:",
+           "Discussion Points:", "Action Items:", "Conclusion:", "Next Meeting Date:"],
+
+    "id": ["Judul Rapat:", "Tanggal & Waktu:", "Peserta:", "Agenda:",
+           "Poin Diskusi:", "Tindakan:", "Kesimpulan:", "Tanggal Rapat Berikutnya:"],
+
+    "ms": ["Tajuk Mesyuarat:", "Tarikh & Masa:", "Peserta:", "Agenda:",
+           "Perkara Dibincangkan:", "Tindakan:", "Kesimpulan:", "Tarikh Mesyuarat Seterusnya:"],
+
+    "tl": ["Pamagat ng Pulong:", "Petsa at Oras:", "Mga Dumalo:", "Adyenda:",
+           "Mga Punto ng Talakayan:", "Mga Hakbang na Dapat Gawin:", "Konklusyon:",
+           "Susunod na Petsa ng Pagpupulong:"]
+}
+
+DOCUMENT_TITLE = "MEETING MINUTES"
+
+_BULLET = re.compile(r"^(?:[-*•]|\d+[.)])\s+(.*)$")
+_NUMBERING = re.compile(r"^(?:#+\s*|\d+[.)]\s*)")
+_OWNER_PREFIX = re.compile(r"^(?P<owner>[A-Z][\w.'-]*(?: [A-Z][\w.'-]*){0,3})\s*[:–—]\s+(?P<task>.+)$")
+_OWNER_TAG = re.compile(r"\((?:owner|pic|assignee|assigned to)\s*:?\s*(?P<owner>[^,;)]+)", re.IGNORECASE)
+_DUE = re.compile(r"\b(?:by|before|due(?: date)?:?)\s+(?P<due>[^,;()]+)", re.IGNORECASE)
+
+
+class Section:
+    """
+    One MoM section: its header, the text on the header line and the lines below it.
+
+    The lines are kept as ordered blocks (`{"kind": "paragraph" | "bullet", "text": ...}`), so a
+    sub-heading such as "Budget review:" stays directly above its own bullets in every format.
+    """
+
+    def __init__(self, key, title, text="", blocks=None):
+        self.key = key
+        self.title = title
+        self.text = text
+        self.blocks = blocks or []
+
+    def add(self, kind, text):
+        self.blocks.append({"kind": kind, "text": text})
+
+    @property
+    def bullets(self):
+        return [block["text"] for block in self.blocks if block["kind"] == "bullet"]
+
+    def to_dict(self):
+        return {
+            "key": self.key,
+            "title": self.title,
+            "text": self.text,
+            "blocks": self.blocks,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        blocks = data.get("blocks")
+        if blocks is None:
+            # ✅ Schema 1 stored paragraphs and bullets apart; their original interleaving is lost
+            blocks = ([{"kind": "paragraph", "text": text} for text in data["paragraphs"]]
+                      + [{"kind": "bullet", "text": text} for text in data["bullets"]])
+        return cls(data["key"], data["title"], data["text"], blocks)
+
+
+class ActionItem:
+    """A task from the action-items section, with its owner and due date when the text names them."""
+
+    def __init__(self, text, owner=None, due=None):
+        self.text = text
+        self.owner = owner
+        self.due = due
+
+    @classmethod
+    def parse(cls, text):
+        owner = due = None
+        if match := _OWNER_TAG.search(text):
+            owner = match.group("owner").strip()
+        elif match := _OWNER_PREFIX.match(text):
+            owner = match.group("owner")
+        if match := _DUE.search(text):
+            due = match.group("due").strip().rstrip(".")
+        return cls(text, owner, due)
+
+    def to_dict(self):
+        return {"text": self.text, "owner": self.owner, "due": self.due}
+
+
+class MoMDocument:
+    """
+    Minutes of Meeting parsed from the final LLM summary.
+
+    Parsing happens once per job; every output format is rendered from this structure,
+    so a new format never needs another LLM call.
+    """
+
+    def __init__(self, language, sections):
+        self.language = language
+        self.sections = sections
+
+    def section(self, key):
+        return next((section for section in self.sections if section.key == key), None)
+
+    @property
+    def title(self):
+        section = self.section("title")
+        return section.text if section else ""
+
+    @property
+    def action_items(self):
+        section = self.section("action_items")
+        return [ActionItem.parse(bullet) for bullet in section.bullets] if section else []
+
+    @classmethod
+    def parse(cls, summary, language="en"):
+        """
+        Splits the summary into sections at the known headers of `language` (falling back to
+        English headers), then into header text and ordered paragraph and bullet blocks.
+
+        Returns:
+            MoMDocument: The parsed minutes. Text before the first header becomes a section
+            with key `None`.
+        """
+        titles = [(key, title) for key, title in zip(SECTION_KEYS, SECTION_TITLES.get(language, SECTION_TITLES["en"]))]
+        if language != "en":
+            titles += list(zip(SECTION_KEYS, SECTION_TITLES["en"]))
+        lowered = [(key, title, title.lower()) for key, title in titles]
+
+        sections = []
+        current = None
+        for line in summary.split("\n"):
+            clean = _NUMBERING.sub("", line.replace("**", "").strip()).strip()
+            if not clean:
+                continue
+
+            header = next(((key, title, name) for key, title, name in lowered if clean.lower().startswith(name)), None)
+            if header:
+                key, title, name = header
+                current = Section(key, title, clean[len(name):].strip())
+                sections.append(current)
+                continue
+
+            if current is None:
+                current = Section(None, None)
+                sections.append(current)
+
+            bullet = _BULLET.match(line.strip().replace("**", ""))
+            if bullet:
+                current.add("bullet", bullet.group(1).strip())
+            else:
+                current.add("paragraph", clean)
+
+        return cls(language, sections)
+
+    def plain_text(self):
+        """The minutes as plain lines (headers, paragraphs, bullets) without any markup, e.g. for scoring."""
+        lines = []
+        for section in self.sections:
+            if section.title:
+                lines.append(f"{section.title} {section.text}".rstrip())
+            lines.extend(block["text"] for block in section.blocks)
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {
+            "schema": SCHEMA_VERSION,
+            "language": self.language,
+            "title": self.title,
+            "sections": [section.to_dict() for section in self.sections],
+            "action_items": [item.to_dict() for item in self.action_items],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["language"], [Section.from_dict(section) for section in data["sections"]])
+
+
+### **🔹 Renderers (PDF lives in pdf_render.py)**
+def render_json(document, path, **style):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+def render_markdown(document, path, **style):
+    lines = [f"# {DOCUMENT_TITLE}", ""]
+    for section in document.sections:
+        if section.title:
+            lines.append(f"**{section.title}** {section.text}".rstrip())
+        lines.extend(f"- {block['text']}" if block["kind"] == "bullet" else block["text"] for block in section.blocks)
+        lines.append("")
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def _docx_paragraph(text, font, size=24, bold=False, color=None, center=False, indent=0):
+    paragraph_properties = ""
+    if center or indent:
+        paragraph_properties = "<w:pPr>" + ('<w:jc w:val="center"/>' if center else "") + \
+                               (f'<w:ind w:left="{indent}" w:hanging="240"/>' if indent else "") + "</w:pPr>"
+    font = quoteattr(font)
+    run_properties = (f'<w:rFonts w:ascii={font} w:hAnsi={font} w:cs={font}/>'
+                      + ("<w:b/>" if bold else "")
+                      + (f'<w:color w:val={quoteattr(color)}/>' if color else "")
+                      + f'<w:sz w:val="{size}"/>')
+    return (f'<w:p>{paragraph_properties}<w:r><w:rPr>{run_properties}</w:rPr>'
+            f'<w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>')
+
+
+def render_docx(document, path, font="Arial", color="000000"):
+    """Writes a minimal WordprocessingML package (no python-docx needed): colored bold headers, bullets."""
+    body = [_docx_paragraph(DOCUMENT_TITLE, font, size=40, bold=True, color=color, center=True)]
+    for section in document.sections:
+        if section.title:
+            body.append(_docx_paragraph(f"{section.title} {section.text}".rstrip(), font, size=28, bold=True, color=color))
+        for block in section.blocks:
+            if block["kind"] == "bullet":
+                body.append(_docx_paragraph(f"•\t{block['text']}", font, indent=480))
+            else:
+                body.append(_docx_paragraph(block["text"], font))
+
+    document_xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{"".join(body)}</w:body></w:document>'
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        docx.writestr("_rels/.rels", _DOCX_RELS)
+        docx.writestr("word/document.xml", document_xml)
@@ -0,0 +1,161 @@
+import os
+import re
+import json
+import time
+from logger import logger
+from disk_cache import make_key
+from mom_document import MoMDocument, render_json, render_markdown, render_docx
+
+OUTPUT_DIR = "outputs"
+
+# ✅ Output formats: file extension, media type and renderer `render(document, path, font=..., color=...)`
+FORMATS = {
+    "pdf": ("pdf", "application/pdf", None),
+    "md": ("md", "text/markdown; charset=utf-8", render_markdown),
+    "docx": ("docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", render_docx),
+    "json": ("json", "application/json", render_json),
+}
+
+
+# ✅ Fonts every renderer accepts: fpdf's core fonts plus the bundled Poppins
+SUPPORTED_FONTS = ("Arial", "Courier", "Helvetica", "Times", "Poppins")
+_HEX_COLOR = re.compile(r"^#?[0-9A-Fa-f]{6}$")
+
+
+class InvalidStyle(ValueError):
+    """A font or color no renderer can use."""
+
+
+def validate_style(font, color):
+    """
+    Checks a requested style before it reaches a renderer (or a cache key).
+
+    Returns:
+        tuple: (font, color as six hex digits without `#`).
+
+    Raises:
+        InvalidStyle: When the font is not in `SUPPORTED_FONTS` or the color is not a HEX color.
+    """
+    if font not in SUPPORTED_FONTS:
+        raise InvalidStyle(f"❌ Unsupported font: {font}. Choose from {', '.join(SUPPORTED_FONTS)}.")
+    if not isinstance(color, str) or not _HEX_COLOR.match(color):
+        raise InvalidStyle(f"❌ Invalid color: {color}. Use a HEX color such as 000000 or #ce08a1.")
+    return font, color.lstrip("#")
+
+
+def download_name(job_id, language, extension="pdf"):
+    """User-facing file name of a job's output, used for `Content-Disposition`."""
+    return f"Meeting_Minutes_{job_id}_{language.upper()}.{extension}"
+
+
+def download_url(job_id, language):
+    """API path serving a job's PDF in `language`."""
+    return f"/download/{job_id}?language={language}"
+
+
+def profile_url(job_id, fmt="speedscope"):
+    """API path serving a profiled job's trace."""
+    return f"/jobs/{job_id}/profile?format={fmt}"
+
+
+class MoMStore:
+    """
+    Keeps each job's parsed MoM documents under `outputs/<job_id>/` and renders them on demand.
+
+    Rendered files are cached in the job's `renders/` directory, keyed by format and style, so asking for
+    another format (or the same one again) costs a render at most once and never an LLM call.
+    """
+
+    def __init__(self, root=OUTPUT_DIR):
+        self.root = root
+
+    def _job_dir(self, job_id):
+        if not job_id.isalnum():
+            raise ValueError(f"❌ Invalid job id: {job_id}")
+        return os.path.join(self.root, job_id)
+
+    def _document_path(self, job_id, language):
+        return os.path.join(self._job_dir(job_id), f"mom_{language}.json")
+
+    def pdf_path(self, job_id, language):
+        """Where the pipeline writes the job's PDF in `language`."""
+        return os.path.join(self._job_dir(job_id), f"mom_{language}.pdf")
+
+    def profile_path(self, job_id, fmt):
+        """Where a profiled job's trace is written in `fmt` (see `profiling.PROFILE_FORMATS`)."""
+        return os.path.join(self._job_dir(job_id), f"profile.{fmt}.json")
+
+    def save(self, job_id, document, font="Arial", color="000000"):
+        """Stores a job's document with the style the job was submitted with."""
+        os.makedirs(self._job_dir(job_id), exist_ok=True)
+        path = self._document_path(job_id, document.language)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"document": document.to_dict(), "style": {"font": font, "color": color}}, f, ensure_ascii=False)
+        os.replace(f"{path}.tmp", path)
+
+    def load(self, job_id, language):
+        """
+        Returns:
+            tuple: (MoMDocument, style dict), or `(None, None)` when the job has no document in `language`.
+        """
+        try:
+            with open(self._document_path(job_id, language), "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None, None
+        return MoMDocument.from_dict(stored["document"]), stored["style"]
+
+    def jobs(self):
+        """Ids of every job with stored outputs."""
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return sorted(name for name in names if name.isalnum() and os.path.isdir(os.path.join(self.root, name)))
+
+    def languages(self, job_id):
+        try:
+            names = os.listdir(self._job_dir(job_id))
+        except FileNotFoundError:
+            return []
+        return sorted(name[4:-5] for name in names if name.startswith("mom_") and name.endswith(".json"))
+
+    def render(self, job_id, language, fmt, font=None, color=None):
+        """
+        Renders a stored document, reusing an earlier render with the same format and style.
+
+        Args:
+            job_id (str): The job that produced the document.
+            language (str): MoM language code.
+            fmt (str): One of `FORMATS`.
+            font (str): Overrides the job's font.
+            color (str): Overrides the job's HEX color.
+
+        Returns:
+            str: Path of the rendered file, or None when the job has no such document.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"❌ Unsupported format: {fmt}. Choose from {', '.join(FORMATS)}.")
+
+        document, style = self.load(job_id, language)
+        if document is None:
+            return None
+
+        font, color = validate_style(font or style["font"], color or style["color"])
+        style = {"font": font, "color": color}
+        extension, _, renderer = FORMATS[fmt]
+        render_dir = os.path.join(self._job_dir(job_id), "renders")
+        path = os.path.join(render_dir, f"mom_{language}_{make_key(fmt, style)[:12]}.{extension}")
+        if os.path.exists(path):
+            return path
+        os.makedirs(render_dir, exist_ok=True)
+
+        if renderer is None:
+            from pdf_render import render_pdf as renderer
+
+        start = time.perf_counter()
+        tmp_path = f"{path}.tmp"
+        renderer(document, tmp_path, **style)
+        os.replace(tmp_path, path)
+        logger.info(f"🖨️ Rendered {fmt.upper()} for job {job_id} ({language}) in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return path
@@ -0,0 +1,225 @@
+import os
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import torch
+import torch.multiprocessing
+import tqdm
+import whisper
+import whisper.transcribe
+from whisper.audio import HOP_LENGTH
+from logger import logger
+from vad import SAMPLE_RATE, split_on_silence
+from audio_decode import decode_audio
+from jobs import JOB_WORKERS
+import profiling
+
+# ✅ CPU transcription pools: every job worker process starts its own, so together
+#    (job workers × processes × threads) should roughly match the host's cores
+ASR_THREADS_PER_WORKER = int(os.getenv("MOMIFY_ASR_THREADS_PER_WORKER", "4"))
+ASR_WORKERS = int(os.getenv("MOMIFY_ASR_WORKERS", str(
+    max(1, (os.cpu_count() or 4) // (ASR_THREADS_PER_WORKER * max(1, JOB_WORKERS))))))
+VAD_TARGET_SECONDS = float(os.getenv("MOMIFY_VAD_TARGET_SECONDS", "60"))
+VAD_MAX_SECONDS = float(os.getenv("MOMIFY_VAD_MAX_SECONDS", "120"))
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+# ✅ Whisper advances its (normally disabled) tqdm bar by mel frames after every decoded window
+FRAMES_PER_SECOND = SAMPLE_RATE / HOP_LENGTH
+_progress_local = threading.local()
+
+
+class _FrameProgressBar(tqdm.tqdm):
+    """Stands in for Whisper's progress bar and forwards decoded frames to this thread's callback."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.frames = 0
+
+    def update(self, n=1):
+        self.frames += n
+        callback = getattr(_progress_local, "callback", None)
+        if callback is not None:
+            callback(self.frames, self.total)
+        return super().update(n)
+
+
+# ✅ `whisper.transcribe` the attribute is the function; patch the module it lives in
+sys.modules["whisper.transcribe"].tqdm = SimpleNamespace(tqdm=_FrameProgressBar)
+
+
+@contextmanager
+def whisper_progress(on_progress, offset_seconds=0.0, total_seconds=None):
+    """
+    Reports `on_progress(done_seconds, total_seconds)` as `model.transcribe` decodes on this thread.
+
+    `offset_seconds` and `total_seconds` place a segment on the whole recording's timeline.
+    """
+    if on_progress is None:
+        yield
+        return
+
+    def callback(frames, total_frames):
+        total = total_seconds if total_seconds is not None else total_frames / FRAMES_PER_SECOND
+        on_progress(min(offset_seconds + frames / FRAMES_PER_SECOND, total), total)
+
+    _progress_local.callback = callback
+    try:
+        yield
+    finally:
+        _progress_local.callback = None
+
+# ✅ Worker-process side: the model arrives once, through shared memory, at pool start
+_worker_model = None
+
+
+def _init_worker(model, threads):
+    global _worker_model
+    torch.set_num_threads(threads)
+    _worker_model = model
+
+
+def _transcribe_segment(index, offset_seconds, audio, decode_options):
+    """Transcribes one segment in a worker and shifts its timestamps to the recording's timeline."""
+    result = _worker_model.transcribe(audio, **decode_options)
+    segments = [
+        {
+            "start": segment["start"] + offset_seconds,
+            "end": segment["end"] + offset_seconds,
+            "text": segment["text"],
+        }
+        for segment in result["segments"]
+    ]
+    return index, result["text"].strip(), segments
+
+
+def get_pool(loaded_model):
+    """Returns the process pool for a resident model, starting it on first use."""
+    key = (loaded_model.size, loaded_model.device)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            # ✅ Move weights to shared memory so workers map them instead of copying ~1.5 GB each;
+            #    under the model lock, since another thread may be transcribing with the same module
+            with loaded_model.lock:
+                loaded_model.model.share_memory()
+            pool = ProcessPoolExecutor(
+                max_workers=ASR_WORKERS,
+                mp_context=torch.multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(loaded_model.model, ASR_THREADS_PER_WORKER),
+            )
+            _pools[key] = pool
+            logger.info(f"⚙️ Started {ASR_WORKERS} transcription worker(s) × {ASR_THREADS_PER_WORKER} thread(s) "
+                        f"for Whisper '{loaded_model.size}'")
+        return pool
+
+
+def detect_language(loaded_model, audio):
+    """Detects the spoken language from the first 30 seconds, so every segment decodes the same language."""
+    with loaded_model as model, profiling.span("detect_language"):
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), model.dims.n_mels).to(model.device)
+        _, probs = model.detect_language(mel)
+    return max(probs, key=probs.get)
+
+
+def prepare_segments(loaded_model, audio, decode_options):
+    """
+    Splits the audio at silences and pins the language for multi-segment recordings.
+
+    Args:
+        audio: Decoded 16 kHz mono samples, or a media file path to decode first.
+
+    Returns:
+        tuple: (audio, segment bounds in samples, decode options).
+    """
+    if isinstance(audio, str):
+        audio = decode_audio(audio)
+    with profiling.span("vad_split"):
+        bounds = split_on_silence(audio, SAMPLE_RATE, VAD_TARGET_SECONDS, VAD_MAX_SECONDS)
+
+    if len(bounds) > 1 and "language" not in decode_options:
+        decode_options = {**decode_options, "language": detect_language(loaded_model, audio)}
+    return audio, bounds, decode_options
+
+
+def transcribe_parallel(loaded_model, audio, on_progress=None, **decode_options):
+    """
+    Transcribes a recording by splitting it at silences and decoding the segments in a process pool.
+
+    Args:
+        loaded_model (LoadedModel): The resident model from `model_registry`.
+        audio: Decoded 16 kHz mono samples (or a media file path).
+        on_progress (callable): Optional `on_progress(done_seconds, total_seconds)`, called as segments finish.
+        **decode_options: Options forwarded to `model.transcribe`.
+
+    Returns:
+        dict: Whisper-style result with `text`, `segments` (recording timestamps) and `language`.
+    """
+    audio, bounds, decode_options = prepare_segments(loaded_model, audio, decode_options)
+
+    if len(bounds) == 1:
+        with loaded_model as model, whisper_progress(on_progress):
+            return model.transcribe(audio, **decode_options)
+
+    logger.info(f"🔀 Transcribing {len(bounds)} VAD segment(s) of {len(audio) / SAMPLE_RATE:.0f}s audio in parallel")
+    start_time = time.time()
+
+    pool = get_pool(loaded_model)
+    futures = [
+        pool.submit(_transcribe_segment, index, start / SAMPLE_RATE, audio[start:end], decode_options)
+        for index, (start, end) in enumerate(bounds)
+    ]
+
+    results = []
+    done_seconds = 0.0
+    total_seconds = len(audio) / SAMPLE_RATE
+    for future in as_completed(futures):
+        results.append(future.result())
+        start, end = bounds[results[-1][0]]
+        done_seconds += (end - start) / SAMPLE_RATE
+        if on_progress:
+            on_progress(done_seconds, total_seconds)
+    results.sort(key=lambda result: result[0])
+
+    logger.info(f"✅ Parallel transcription finished in {time.time() - start_time:.1f}s")
+    return {
+        "text": " ".join(text for _, text, _ in results if text),
+        "segments": [segment for _, _, segments in results for segment in segments],
+        "language": decode_options["language"],
+    }
+
+
+def iter_transcribe(loaded_model, audio, parallel=False, on_progress=None, **decode_options):
+    """
+    Yields the transcript text of each VAD segment, in recording order, as soon as it is decoded.
+
+    With `parallel=True` segments are decoded by the process pool and yielded in order as they
+    complete; otherwise they are decoded one after another in this process. `on_progress`
+    receives `(done_seconds, total_seconds)` as decoding advances.
+    """
+    audio, bounds, decode_options = prepare_segments(loaded_model, audio, decode_options)
+    total_seconds = len(audio) / SAMPLE_RATE
+
+    if parallel and len(bounds) > 1:
+        pool = get_pool(loaded_model)
+        futures = [
+            pool.submit(_transcribe_segment, index, start / SAMPLE_RATE, audio[start:end], decode_options)
+            for index, (start, end) in enumerate(bounds)
+        ]
+        for future, (_, end) in zip(futures, bounds):
+            text = future.result()[1]
+            if on_progress:
+                on_progress(end / SAMPLE_RATE, total_seconds)
+            yield text
+        return
+
+    for index, (start, end) in enumerate(bounds):
+        with loaded_model as model, whisper_progress(on_progress, start / SAMPLE_RATE, total_seconds), \
+                profiling.span("whisper_segment", index=index, seconds=round((end - start) / SAMPLE_RATE, 1)):
+            text = model.transcribe(audio[start:end], **decode_options)["text"].strip()
+        yield text
@@ -0,0 +1,147 @@
+import os
+import copy
+import threading
+from datetime import datetime
+from fpdf import FPDF
+from logger import logger
+from mom_document import DOCUMENT_TITLE
+
+FONT_DIR = os.path.join("assets", "fonts")
+LOGO_PATH = os.path.join("assets", "logo.png")
+
+# ✅ TrueType fonts bundled with MoMify, registered on every document
+CUSTOM_FONTS = [
+    ("Poppins", "", "Poppins-Regular.ttf"),
+    ("Poppins", "B", "Poppins-Bold.ttf"),
+]
+
+# ✅ Per-process resources shared by every document: parsed font metrics and the decoded logo
+_resources_lock = threading.Lock()
+_font_entries = None
+_logo_info = None
+_logo_loaded = False
+
+
+def _register_fonts(pdf):
+    """
+    Adds `CUSTOM_FONTS` to a document, parsing their metrics only once per process.
+
+    The first document registers the fonts through `add_font` and the resulting entries are
+    kept; later documents receive copies with their own index and glyph subset, sharing the
+    (read-only) character widths.
+    """
+    global _font_entries
+    with _resources_lock:
+        if _font_entries is None:
+            fonts_before, files_before = set(pdf.fonts), set(pdf.font_files)
+            for family, style, filename in CUSTOM_FONTS:
+                pdf.add_font(family, style, os.path.join(FONT_DIR, filename), uni=True)
+            _font_entries = (
+                {key: {**entry, "subset": copy.deepcopy(entry["subset"])}
+                 for key, entry in pdf.fonts.items() if key not in fonts_before},
+                {key: dict(entry) for key, entry in pdf.font_files.items() if key not in files_before},
+            )
+            logger.info(f"🔤 Loaded metrics for {len(_font_entries[0])} PDF font(s)")
+            return
+
+    fonts, font_files = _font_entries
+    for key, entry in fonts.items():
+        pdf.fonts[key] = {**entry, "i": len(pdf.fonts) + 1, "subset": copy.deepcopy(entry["subset"])}
+    for key, entry in font_files.items():
+        pdf.font_files[key] = dict(entry)
+
+
+def _load_logo():
+    """Decodes the footer logo once per process (PNG alpha splitting is slow in pure Python)."""
+    global _logo_info, _logo_loaded
+    with _resources_lock:
+        if not _logo_loaded:
+            try:
+                _logo_info = FPDF()._parsepng(LOGO_PATH)
+            except Exception as e:
+                logger.warning(f"⚠️ MoMify logo not available at '{LOGO_PATH}': {e}")
+            _logo_loaded = True
+    return _logo_info
+
+
+class PDFWithFooter(FPDF):
+    """A MoM document whose footer (logo + generation time) is laid out once and reused on every page."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.footer_text = f"Generated by MoMify | {datetime.now().strftime('%B %d, %Y at %I:%M %p')}"
+        self.footer_layout = None
+        _register_fonts(self)
+
+        logo = _load_logo()
+        if logo is not None:
+            # ✅ Shallow copy: output deletes `data` and stores object numbers on the per-document entry
+            self.images[LOGO_PATH] = {**logo, "i": len(self.images) + 1}
+
+    def footer(self):
+        self.set_y(-15)  # Position footer 15mm from the bottom
+        self.set_font("Arial", "I", 10)
+        self.set_text_color(150, 150, 150)  # Light gray text
+
+        logo_width = logo_height = 6
+        if self.footer_layout is None:
+            # ✅ Centered logo + text; the text never changes within a document
+            total_width = self.get_string_width(self.footer_text) + logo_width + 5
+            self.footer_layout = ((self.w - total_width) / 2, self.get_y() + 1)
+        x_position, y_position = self.footer_layout
+
+        if LOGO_PATH in self.images:
+            self.image(LOGO_PATH, x=x_position, y=y_position - 1, w=logo_width, h=logo_height)
+        self.set_xy(x_position + logo_width + 3, y_position)
+        self.cell(0, 6, self.footer_text, align="L")
+
+
+def warm_up():
+    """Loads font metrics and the logo ahead of the first render."""
+    PDFWithFooter()
+
+
+def render_pdf(document, pdf_path, font="Arial", color="000000"):
+    """
+    Renders a parsed MoM document into a PDF file.
+
+    Args:
+        document (MoMDocument): The parsed minutes.
+        pdf_path (str): Output path.
+        font (str): Body font family.
+        color (str): HEX color of the title, rule and section headers.
+
+    Returns:
+        int: Number of pages rendered.
+    """
+    rgb = tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+    pdf = PDFWithFooter()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+
+    # ✅ Title and colored rule
+    pdf.set_font(font, "B", 20)
+    pdf.set_text_color(*rgb)
+    pdf.cell(200, 10, DOCUMENT_TITLE, ln=True, align='C')
+    pdf.ln(2)
+    pdf.set_draw_color(*rgb)
+    pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+    pdf.ln(8)
+
+    for section in document.sections:
+        if section.title:
+            pdf.set_font(font, "B", 14)
+            pdf.set_text_color(*rgb)
+            pdf.multi_cell(0, 10, f"{section.title} {section.text}".rstrip())
+            pdf.ln(2)
+
+        pdf.set_font(font, "", 12)
+        pdf.set_text_color(0, 0, 0)
+        lines = [f"- {block['text']}" if block["kind"] == "bullet" else block["text"] for block in section.blocks]
+        for line in lines + [""]:
+            pdf.multi_cell(0, 10, line)
+            pdf.ln(2)
+
+    pdf.output(pdf_path)
+    return pdf.page_no()
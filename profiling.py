@@ -0,0 +1,262 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import threading
+import contextvars
+from contextlib import contextmanager
+from logger import logger
+
+SAMPLE_INTERVAL = float(os.getenv("MOMIFY_PROFILE_SAMPLE_INTERVAL", "0.01"))
+MAX_SAMPLES = int(os.getenv("MOMIFY_PROFILE_MAX_SAMPLES", "200000"))
+
+# ✅ Formats a job's profile can be downloaded in, with their media type
+PROFILE_FORMATS = {
+    "speedscope": "application/json",
+    "chrome": "application/json",
+}
+
+# ✅ The active job's profiler; unset (the default) means every hook below is a no-op
+_active = contextvars.ContextVar("momify_profiler", default=None)
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def _track_name():
+    """Spans are grouped per asyncio task when inside one (tasks interleave on a thread), else per thread."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return f"task {task.get_name()}" if task is not None else threading.current_thread().name
+
+
+class _Span:
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.track = _track_name()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args = {**self.args, "error": repr(exc)}
+        self.profiler.add(self.track, self.name, self.start, time.perf_counter(), self.args)
+        return False
+
+
+class Profiler:
+    """
+    Wall-clock trace of one job: explicit spans plus, optionally, sampled Python stacks.
+
+    Spans and sampled stacks are both kept as `(track, name, start, end, args)` intervals,
+    which export directly to Chrome-trace `X` events or speedscope evented profiles.
+    """
+
+    def __init__(self, job_id, sample_interval=None):
+        self.job_id = job_id
+        self.sample_interval = sample_interval
+        self.origin = time.perf_counter()
+        self.intervals = []
+        self._lock = threading.Lock()
+        self._samples = []
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def add(self, track, name, start, end, args=None):
+        with self._lock:
+            self.intervals.append((track, name, start, end, args or {}))
+
+    def span(self, name, **args):
+        return _Span(self, name, args)
+
+    ### **🔹 Stack sampling**
+    def start_sampling(self):
+        self._sampler = threading.Thread(target=self._sample, name=f"profiler-{self.job_id}", daemon=True)
+        self._sampler.start()
+
+    def stop_sampling(self):
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+            self._samples_to_intervals()
+
+    def _sample(self):
+        names = {}
+        while not self._stop.wait(self.sample_interval) and len(self._samples) < MAX_SAMPLES:
+            now = time.perf_counter()
+            threads = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == threading.get_ident():
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    key = (code.co_filename, code.co_firstlineno, code.co_name)
+                    if key not in names:
+                        names[key] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                    stack.append(names[key])
+                    frame = frame.f_back
+                stack.reverse()
+                self._samples.append((now, f"samples: {threads.get(ident, ident)}", tuple(stack)))
+
+    def _samples_to_intervals(self):
+        """Turns consecutive samples of a thread into frame intervals (a flame chart over time)."""
+        open_frames = {}
+        last_time = {}
+        for now, track, stack in self._samples:
+            current = open_frames.setdefault(track, [])
+            common = 0
+            while common < min(len(current), len(stack)) and current[common][0] == stack[common]:
+                common += 1
+            for name, start in reversed(current[common:]):
+                self.add(track, name, start, now, {"sampled": True})
+            del current[common:]
+            current.extend((name, now) for name in stack[common:])
+            last_time[track] = now
+
+        for track, current in open_frames.items():
+            end = last_time[track] + self.sample_interval
+            for name, start in reversed(current):
+                self.add(track, name, start, end, {"sampled": True})
+        self._samples = []
+
+    ### **🔹 Export**
+    def _sorted_intervals(self):
+        # ✅ Parents first: earlier start, then longer duration
+        return sorted(self.intervals, key=lambda interval: (interval[0], interval[2], -interval[3]))
+
+    def chrome_trace(self):
+        """The trace in Chrome's Trace Event format (chrome://tracing, Perfetto, speedscope)."""
+        pid = os.getpid()
+        tracks = {}
+        events = []
+        for track, name, start, end, args in self._sorted_intervals():
+            tid = tracks.setdefault(track, len(tracks) + 1)
+            events.append({
+                "name": name, "cat": "sample" if args.get("sampled") else "span", "ph": "X",
+                "ts": round((start - self.origin) * 1e6, 1), "dur": round((end - start) * 1e6, 1),
+                "pid": pid, "tid": tid, "args": {key: value for key, value in args.items() if key != "sampled"},
+            })
+        metadata = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"MoMify job {self.job_id}"}}]
+        metadata += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": track}}
+                     for track, tid in tracks.items()]
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def speedscope(self):
+        """The trace as a speedscope file: one evented profile per thread, task or sampled thread."""
+        frames = {}
+        by_track = {}
+        for interval in self._sorted_intervals():
+            by_track.setdefault(interval[0], []).append(interval)
+
+        profiles = []
+        for track, intervals in by_track.items():
+            events = []
+            stack = []  # (frame, end time) of the open frames
+            for _, name, start, end, _ in intervals:
+                start, end = start - self.origin, end - self.origin
+                while stack and stack[-1][1] <= start:
+                    frame, close = stack.pop()
+                    events.append({"type": "C", "frame": frame, "at": close})
+                if stack:
+                    end = min(end, stack[-1][1])  # ✅ Clamp to the parent so events stay nested
+                frame = frames.setdefault(name, len(frames))
+                events.append({"type": "O", "frame": frame, "at": start})
+                stack.append((frame, end))
+            while stack:
+                frame, close = stack.pop()
+                events.append({"type": "C", "frame": frame, "at": close})
+
+            profiles.append({
+                "type": "evented", "name": track, "unit": "seconds",
+                "startValue": events[0]["at"], "endValue": max(event["at"] for event in events), "events": events,
+            })
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"MoMify job {self.job_id}",
+            "exporter": "momify",
+            "shared": {"frames": [{"name": name} for name in frames]},
+            "profiles": profiles,
+        }
+
+    def write(self, path_for):
+        """Writes every format in `PROFILE_FORMATS` to `path_for(fmt)`."""
+        for fmt, export in (("speedscope", self.speedscope), ("chrome", self.chrome_trace)):
+            path = path_for(fmt)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(export(), f)
+            os.replace(f"{path}.tmp", path)
+
+
+def parse_mode(value):
+    """
+    Reads the profiling switch of a request: `1`/`true`/`on` traces spans, `sampled` also samples stacks.
+
+    Returns:
+        str: `"spans"`, `"sampled"`, or None when profiling is off.
+    """
+    value = str(value or "").strip().lower()
+    if value == "sampled":
+        return "sampled"
+    return "spans" if value in ("1", "true", "yes", "on", "spans") else None
+
+
+def span(name, **args):
+    """A traced block of the active job, or a shared no-op when the job is not profiled."""
+    profiler = _active.get()
+    return _NO_SPAN if profiler is None else profiler.span(name, **args)
+
+
+@contextmanager
+def job_profile(job_id, mode, path_for):
+    """
+    Profiles the enclosed pipeline run when `mode` is set and writes the trace via `path_for(fmt)`.
+
+    Spans opened by this thread, its asyncio tasks and work handed over with `propagate` belong
+    to this job; with `mode="sampled"` every thread of the process is sampled as well.
+    """
+    if not mode or not job_id:
+        yield None
+        return
+
+    profiler = Profiler(job_id, SAMPLE_INTERVAL if mode == "sampled" else None)
+    token = _active.set(profiler)
+    if profiler.sample_interval:
+        profiler.start_sampling()
+    try:
+        with profiler.span("pipeline", job_id=job_id):
+            yield profiler
+    finally:
+        _active.reset(token)
+        profiler.stop_sampling()
+        try:
+            profiler.write(path_for)
+            logger.info(f"🔬 Profile for job {job_id} written ({len(profiler.intervals)} interval(s))")
+        except OSError as e:
+            logger.error(f"❌ Could not write the profile for job {job_id}: {e}")
+
+
+def propagate(function):
+    """Wraps `function` to run in the caller's context, so executor threads see the active profiler."""
+    if _active.get() is None:
+        return function
+    context = contextvars.copy_context()
+    return lambda *args: context.copy().run(function, *args)
@@ -0,0 +1,108 @@
+import os
+import json
+import time
+import threading
+
+# ✅ Share of the whole run each stage accounts for, used for the overall percentage
+STAGE_WEIGHTS = {"extract": 5, "transcribe": 60, "summarize": 30, "pdf": 5}
+# ✅ Minimum seconds between two progress events of the same stage (stage changes are always sent)
+PROGRESS_INTERVAL = float(os.getenv("MOMIFY_PROGRESS_INTERVAL", "0.5"))
+
+
+def format_sse(event):
+    """Encodes an event as a server-sent event named after its type."""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+class ProgressTracker:
+    """
+    Turns stage changes and per-stage counters into typed progress events.
+
+    Every event carries the stage, the overall and stage percentages, elapsed time and the
+    stage ETA; transcription events add audio seconds processed and map-phase events add the
+    chunk index. Counters may be reported from any thread; events are handed to `sink`.
+    """
+
+    def __init__(self, sink, interval=PROGRESS_INTERVAL):
+        self.sink = sink
+        self.interval = interval
+        self.started_at = time.time()
+        self.stage_name = None
+        self.stage_started_at = None
+        self.fraction = 0.0
+        self.chunks_done = 0
+        self._last_sent = 0.0
+        self._lock = threading.Lock()
+
+    def _percent(self, fraction):
+        if self.stage_name is None:
+            return 0.0
+        stages = list(STAGE_WEIGHTS)
+        done = sum(STAGE_WEIGHTS[name] for name in stages[:stages.index(self.stage_name)])
+        return round(100 * (done + STAGE_WEIGHTS[self.stage_name] * fraction) / sum(STAGE_WEIGHTS.values()), 1)
+
+    def _event(self, event_type, **fields):
+        now = time.time()
+        # ✅ An error can come before the first stage (e.g. while setting up the decode)
+        stage_elapsed = now - self.stage_started_at if self.stage_started_at is not None else 0.0
+        eta = stage_elapsed * (1 - self.fraction) / self.fraction if 0 < self.fraction < 1 else None
+        return {
+            "type": event_type,
+            "stage": self.stage_name,
+            "percent": self._percent(self.fraction),
+            "stage_percent": round(100 * self.fraction, 1),
+            "elapsed_seconds": round(now - self.started_at, 1),
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            **fields,
+        }
+
+    def stage(self, name, message):
+        """Starts a stage (one of `STAGE_WEIGHTS`) and always sends a `stage` event."""
+        with self._lock:
+            self.stage_name = name
+            self.stage_started_at = time.time()
+            self.fraction = 0.0
+            self.chunks_done = 0
+            self._last_sent = self.stage_started_at
+            event = self._event("stage", message=message)
+        self.sink(event)
+
+    def _progress(self, fraction, force=False, **fields):
+        with self._lock:
+            if self.stage_name is None:
+                return
+            self.fraction = max(self.fraction, min(fraction, 1.0))
+            now = time.time()
+            if not force and self.fraction < 1.0 and now - self._last_sent < self.interval:
+                return
+            self._last_sent = now
+            event = self._event("progress", **fields)
+        self.sink(event)
+
+    def audio(self, done_seconds, total_seconds):
+        """Reports transcription progress in seconds of audio decoded."""
+        fraction = done_seconds / total_seconds if total_seconds else 0.0
+        self._progress(fraction, audio_seconds=round(done_seconds, 1), audio_total_seconds=round(total_seconds, 1))
+
+    def chunk(self, index, total=None):
+        """
+        Reports one finished map-phase chunk summary.
+
+        With a known `total` the chunks drive the stage percentage (the final merge counts as
+        one more step); while streaming, the total is unknown and audio progress drives it.
+        """
+        with self._lock:
+            self.chunks_done += 1
+            done = self.chunks_done
+            fraction = done / (total + 1) if total else self.fraction
+        self._progress(fraction, force=True, chunk_index=index, chunk_total=total, chunks_done=done)
+
+    def complete(self, **fields):
+        with self._lock:
+            self.fraction = 1.0
+            event = {**self._event("complete", **fields), "percent": 100.0}
+        return event
+
+    def error(self, message):
+        with self._lock:
+            return self._event("error", error=message)
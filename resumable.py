@@ -0,0 +1,219 @@
+import os
+import json
+import asyncio
+import hashlib
+from logger import logger
+from workspace import JobWorkspace, WORKSPACE_DIR
+from ingest import MAX_UPLOAD_BYTES, UploadTooLarge, UploadError
+
+# ✅ Size of each numbered chunk (the last one may be shorter)
+UPLOAD_CHUNK_SIZE = int(os.getenv("MOMIFY_UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+SESSION_FILE = "session.json"
+PART_FILE = "upload.part"
+
+
+class ChunkConflict(Exception):
+    """Raised when a chunk does not continue the received data; carries the session for its offset."""
+
+    def __init__(self, message, session):
+        super().__init__(message)
+        self.session = session
+
+
+class UploadSession:
+    """
+    A resumable upload assembled in a pending job workspace.
+
+    Chunks are appended strictly in order, so the file is assembled in place and its SHA-256
+    is updated incrementally; finalizing never re-reads the data. Session metadata is
+    persisted next to the data so uploads survive an API restart.
+    """
+
+    def __init__(self, workspace, filename, size, chunk_size, sha256=None, offset=0, chunk_hashes=None):
+        self.workspace = workspace
+        self.filename = filename
+        self.size = size
+        self.chunk_size = chunk_size
+        self.sha256 = sha256
+        self.offset = offset
+        self.chunk_hashes = chunk_hashes or []
+        self.digest = hashlib.sha256()
+        self.lock = asyncio.Lock()
+
+    @property
+    def id(self):
+        return self.workspace.token
+
+    @property
+    def part_path(self):
+        return self.workspace.path(PART_FILE)
+
+    @property
+    def next_chunk(self):
+        return len(self.chunk_hashes)
+
+    @property
+    def complete(self):
+        return self.offset == self.size
+
+    def to_dict(self):
+        return {
+            "upload_id": self.id,
+            "filename": self.filename,
+            "size": self.size,
+            "chunk_size": self.chunk_size,
+            "offset": self.offset,
+            "next_chunk": self.next_chunk,
+            "complete": self.complete,
+        }
+
+    def save(self):
+        metadata = {
+            "filename": self.filename,
+            "size": self.size,
+            "chunk_size": self.chunk_size,
+            "sha256": self.sha256,
+            "offset": self.offset,
+            "chunk_hashes": self.chunk_hashes,
+        }
+        tmp_path = self.workspace.path(f"{SESSION_FILE}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+        os.replace(tmp_path, self.workspace.path(SESSION_FILE))
+
+    @classmethod
+    def load(cls, upload_id):
+        """Restores a session persisted by an earlier process, re-hashing the data received so far."""
+        workspace = JobWorkspace(os.path.join(WORKSPACE_DIR, f"pending-{upload_id}"), upload_id)
+        try:
+            with open(workspace.path(SESSION_FILE), "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        session = cls(workspace, **metadata)
+        try:
+            part_size = os.path.getsize(session.part_path)
+        except FileNotFoundError:
+            part_size = -1
+        if part_size < session.offset:
+            # ✅ Metadata without (all of) its data, e.g. after a partial cleanup: the upload cannot resume
+            logger.warning(f"⚠️ Upload session {upload_id} has lost its data; treating it as expired")
+            return None
+
+        with open(session.part_path, "r+b") as f:
+            f.truncate(session.offset)
+            while chunk := f.read(1024 * 1024):
+                session.digest.update(chunk)
+        logger.info(f"♻️ Restored upload session {upload_id} at offset {session.offset}")
+        return session
+
+
+class UploadSessionStore:
+    """Creates, looks up and finalizes resumable upload sessions."""
+
+    def __init__(self):
+        self._sessions = {}
+
+    def create(self, filename, size, sha256=None, chunk_size=UPLOAD_CHUNK_SIZE):
+        if size <= 0:
+            raise UploadError("❌ Upload size must be positive.")
+        if size > MAX_UPLOAD_BYTES:
+            raise UploadTooLarge(f"❌ File too large! Max {MAX_UPLOAD_BYTES / 1_000_000_000:g}GB allowed.")
+
+        workspace = JobWorkspace.create()
+        session = UploadSession(workspace, os.path.basename(filename), size, chunk_size, sha256)
+        open(session.part_path, "wb").close()
+        session.save()
+        self._sessions[session.id] = session
+        logger.info(f"📤 Upload session {session.id} created for {session.filename} ({size / (1024 * 1024):.1f} MB)")
+        return session
+
+    async def get(self, upload_id):
+        session = self._sessions.get(upload_id)
+        if session is None and upload_id.isalnum():
+            # ✅ Restoring re-hashes everything received so far; keep that off the event loop
+            session = await asyncio.to_thread(UploadSession.load, upload_id)
+            if session is not None:
+                self._sessions[upload_id] = session
+        return session
+
+    async def write_chunk(self, session, index, stream, checksum):
+        """
+        Appends chunk `index` from an async byte stream after verifying its SHA-256.
+
+        Re-sending an already stored chunk with the same checksum is accepted as a no-op so
+        clients can retry after a lost response.
+
+        Raises:
+            ChunkConflict: When `index` is not the next expected chunk.
+            UploadError: When the chunk has the wrong length or checksum.
+        """
+        if not checksum:
+            raise UploadError("❌ Missing X-Chunk-SHA256 header.")
+
+        async with session.lock:
+            if 0 <= index < session.next_chunk and session.chunk_hashes[index] == checksum.lower():
+                return session
+            if index != session.next_chunk or session.complete:
+                raise ChunkConflict(f"❌ Expected chunk {session.next_chunk}, got {index}.", session)
+
+            expected_length = min(session.chunk_size, session.size - session.offset)
+            chunk_digest = hashlib.sha256()
+            file_digest = session.digest.copy()
+            length = 0
+
+            with open(session.part_path, "r+b") as f:
+                f.seek(session.offset)
+                async for data in stream:
+                    length += len(data)
+                    if length > expected_length:
+                        break
+                    chunk_digest.update(data)
+                    file_digest.update(data)
+                    await asyncio.to_thread(f.write, data)
+
+                error = None
+                if length != expected_length:
+                    error = f"❌ Chunk {index} must be {expected_length} bytes."
+                elif chunk_digest.hexdigest() != checksum.lower():
+                    error = f"❌ Checksum mismatch for chunk {index}."
+
+                if error:
+                    # ✅ Drop the rejected bytes so the upload resumes from the last good offset
+                    f.truncate(session.offset)
+                    raise UploadError(error)
+
+            session.offset += length
+            session.digest = file_digest
+            session.chunk_hashes.append(chunk_digest.hexdigest())
+            await asyncio.to_thread(session.save)
+            return session
+
+    def finalize(self, session):
+        """
+        Turns a complete upload into a sealed job workspace.
+
+        Returns:
+            tuple: (workspace, input file path, content hash).
+        """
+        if not session.complete:
+            raise UploadError(f"❌ Upload incomplete: {session.offset}/{session.size} bytes received.")
+
+        content_hash = session.digest.hexdigest()
+        if session.sha256 and session.sha256.lower() != content_hash:
+            raise UploadError("❌ Checksum mismatch for the assembled file.")
+
+        workspace = session.workspace
+        extension = os.path.splitext(session.filename)[1].lower()
+        os.replace(session.part_path, workspace.path(f"input{extension}"))
+        os.remove(workspace.path(SESSION_FILE))
+        workspace.seal(content_hash)
+        self._sessions.pop(session.id, None)
+
+        logger.info(f"✅ Upload {session.id} finalized ({session.filename}, sha256 {content_hash[:12]})")
+        return workspace, workspace.path(f"input{extension}"), content_hash
+
+    def abort(self, session):
+        self._sessions.pop(session.id, None)
+        session.workspace.cleanup()
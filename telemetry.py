@@ -0,0 +1,176 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+import profiling
+
+# ✅ Seconds buckets cover a sub-second chunking pass up to a half-hour transcription
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+REALTIME_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 16, 32, 64, 128)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+_lock = threading.Lock()
+_forward = None
+
+
+def _label_text(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _number(value):
+    return "+Inf" if value == float("inf") else repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base for metrics rendered in the Prometheus text exposition format."""
+
+    kind = None
+
+    def __init__(self, name, description, labelnames=()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _record(self, value, labels):
+        if _forward is not None:
+            # ✅ Worker processes hand observations to the API process, which owns the registry
+            _forward(self.name, value, labels)
+        else:
+            self.apply(value, labels)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        self._record(amount, labels)
+
+    def apply(self, amount, labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with _lock:
+            values = dict(self._values)
+        return self.header() + [f"{self.name}{_label_text(self.labelnames, key)} {_number(value)}"
+                                for key, value in sorted(values.items())]
+
+
+class Gauge(Metric):
+    """A gauge read from `function()` at scrape time; it yields `(labels, value)` pairs."""
+
+    kind = "gauge"
+
+    def __init__(self, name, description, function, labelnames=()):
+        super().__init__(name, description, labelnames)
+        self.function = function
+
+    def render(self):
+        values = {self._key(labels): value for labels, value in self.function()}
+        return self.header() + [f"{self.name}{_label_text(self.labelnames, key)} {_number(value)}"
+                                for key, value in sorted(values.items())]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, description, labelnames=(), buckets=STAGE_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        self._record(value, labels)
+
+    def apply(self, value, labels):
+        key = self._key(labels)
+        with _lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def render(self):
+        with _lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+
+        lines = self.header()
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, [('le', _number(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+REGISTRY = []
+
+PIPELINE_SECONDS = Histogram("momify_pipeline_duration_seconds",
+                             "Wall-clock seconds from upload to finished PDFs, per pipeline run.", ["outcome"])
+STAGE_SECONDS = Histogram("momify_stage_duration_seconds", "Wall-clock seconds spent in a pipeline stage.", ["stage"])
+REALTIME_FACTOR = Histogram("momify_transcription_realtime_factor",
+                            "Audio seconds transcribed per wall-clock second, per transcription.", ["model"],
+                            buckets=REALTIME_BUCKETS)
+AUDIO_SECONDS = Counter("momify_audio_seconds_total", "Seconds of audio transcribed.", ["model"])
+LLM_TOKENS = Histogram("momify_llm_tokens", "Tokens per LLM request.", ["phase", "kind"], buckets=TOKEN_BUCKETS)
+LLM_REQUESTS = Counter("momify_llm_requests_total", "LLM requests by phase, including cache hits.", ["phase", "cached"])
+
+
+def set_forwarder(forward):
+    """Routes every observation to `forward(metric_name, value, labels)` instead of the local registry."""
+    global _forward
+    _forward = forward
+
+
+def apply(name, value, labels):
+    """Records an observation forwarded from another process."""
+    metric = next((metric for metric in REGISTRY if metric.name == name), None)
+    if metric is not None:
+        metric.apply(value, labels)
+
+
+@contextmanager
+def stage_timer(stage):
+    """Observes the wall-clock duration of the enclosed block under `stage` (and traces it when profiling)."""
+    start = time.perf_counter()
+    try:
+        with profiling.span(stage):
+            yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+@contextmanager
+def pipeline_timer():
+    """Observes a whole pipeline run, labelled `completed` or `failed`."""
+    start = time.perf_counter()
+    outcome = "failed"
+    try:
+        yield
+        outcome = "completed"
+    finally:
+        PIPELINE_SECONDS.observe(time.perf_counter() - start, outcome=outcome)
+
+
+def observe_transcription(model, audio_seconds, wall_seconds):
+    AUDIO_SECONDS.inc(audio_seconds, model=model)
+    if wall_seconds > 0:
+        REALTIME_FACTOR.observe(audio_seconds / wall_seconds, model=model)
+
+
+def render():
+    """The whole registry in the Prometheus text exposition format (version 0.0.4)."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
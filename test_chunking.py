@@ -0,0 +1,54 @@
+import pytest
+
+tiktoken = pytest.importorskip("tiktoken")
+from chunking import split_text_into_chunks, count_tokens, get_encoding, StreamingChunker
+
+try:
+    get_encoding()
+except Exception as e:  # ✅ The tokenizer data is downloaded on first use
+    pytest.skip(f"gpt-4 tokenizer unavailable: {e}", allow_module_level=True)
+
+SENTENCES = [f"Item {i} covers the budget review and who owns the follow-up." for i in range(120)]
+TRANSCRIPT = " ".join(SENTENCES)
+
+
+def test_short_text_is_a_single_chunk():
+    assert split_text_into_chunks("  Hello team.  ", max_tokens=50) == ["Hello team."]
+    assert split_text_into_chunks("   ") == []
+
+
+def test_chunks_fit_the_budget_and_end_on_sentences():
+    chunks = split_text_into_chunks(TRANSCRIPT, max_tokens=100)
+
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 100 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert " ".join(chunks) == TRANSCRIPT
+
+
+def test_chunks_fall_back_to_word_boundaries():
+    text = " ".join(f"word{i}" for i in range(2000))
+    chunks = split_text_into_chunks(text, max_tokens=64)
+
+    assert all(count_tokens(chunk) <= 64 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_overlap_repeats_the_end_of_the_previous_chunk():
+    chunks = split_text_into_chunks(TRANSCRIPT, max_tokens=100, overlap_tokens=20)
+
+    assert all(count_tokens(chunk) <= 100 for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        words = chunk.split()
+        assert any(previous.endswith(" ".join(words[:n])) for n in range(1, 20))
+
+
+@pytest.mark.parametrize("overlap_tokens", [0, 20])
+def test_streaming_matches_batch(overlap_tokens):
+    chunker = StreamingChunker(max_tokens=100, overlap_tokens=overlap_tokens)
+    streamed = []
+    for sentence in SENTENCES:
+        streamed.extend(chunker.feed(sentence))
+    streamed.extend(chunker.flush())
+
+    assert streamed == split_text_into_chunks(TRANSCRIPT, max_tokens=100, overlap_tokens=overlap_tokens)
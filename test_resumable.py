@@ -0,0 +1,89 @@
+import os
+import asyncio
+import hashlib
+import pytest
+from ingest import UploadError
+from resumable import UploadSessionStore, ChunkConflict
+
+CHUNK_SIZE = 4
+DATA = b"0123456789"  # ✅ Three chunks: 4 + 4 + 2 bytes
+CHUNKS = [DATA[i:i + CHUNK_SIZE] for i in range(0, len(DATA), CHUNK_SIZE)]
+
+
+@pytest.fixture(autouse=True)
+def workspace_root(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # WORKSPACE_DIR is relative to the working directory
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+async def stream(data):
+    yield data
+
+
+def write(store, session, index, data, checksum=None):
+    return asyncio.run(store.write_chunk(session, index, stream(data), checksum or sha256(data)))
+
+
+def create(store):
+    return store.create("meeting.mp3", len(DATA), sha256(DATA), chunk_size=CHUNK_SIZE)
+
+
+def test_upload_resumes_at_its_offset_after_a_restart():
+    store = UploadSessionStore()
+    session = create(store)
+    write(store, session, 0, CHUNKS[0])
+    write(store, session, 1, CHUNKS[1])
+
+    restarted = UploadSessionStore()
+    restored = asyncio.run(restarted.get(session.id))
+    assert restored.to_dict()["offset"] == 8
+    assert restored.next_chunk == 2
+
+    write(restarted, restored, 2, CHUNKS[2])
+    workspace, input_path, content_hash = restarted.finalize(restored)
+
+    assert content_hash == sha256(DATA)
+    with open(input_path, "rb") as f:
+        assert f.read() == DATA
+
+
+def test_checksum_mismatch_rolls_back_to_the_last_good_offset():
+    store = UploadSessionStore()
+    session = create(store)
+    write(store, session, 0, CHUNKS[0])
+
+    with pytest.raises(UploadError, match="Checksum mismatch"):
+        write(store, session, 1, CHUNKS[1], checksum=sha256(b"something else"))
+
+    assert session.offset == 4
+    assert os.path.getsize(session.part_path) == 4
+
+    write(store, session, 1, CHUNKS[1])
+    write(store, session, 2, CHUNKS[2])
+    assert store.finalize(session)[2] == sha256(DATA)
+
+
+def test_out_of_order_chunk_is_rejected_with_the_expected_offset():
+    store = UploadSessionStore()
+    session = create(store)
+
+    with pytest.raises(ChunkConflict) as conflict:
+        write(store, session, 1, CHUNKS[1])
+    assert conflict.value.session.to_dict()["next_chunk"] == 0
+    assert os.path.getsize(session.part_path) == 0
+
+    write(store, session, 0, CHUNKS[0])
+    write(store, session, 0, CHUNKS[0])  # ✅ A retried chunk is a no-op
+    assert session.offset == 4
+
+
+def test_session_without_its_data_is_expired():
+    store = UploadSessionStore()
+    session = create(store)
+    write(store, session, 0, CHUNKS[0])
+    os.remove(session.part_path)
+
+    assert asyncio.run(UploadSessionStore().get(session.id)) is None
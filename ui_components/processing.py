@@ -1,12 +1,39 @@
 import streamlit as st
 import requests
 import time
+import json
 import streamlit.components.v1 as components
 from ui_components.stepper import render_stepper
 from logger import logger, log_messages
 
 API_URL = "http://localhost:8000"
 
+# ✅ Stepper position for each pipeline stage reported by the API
+STAGE_STEPS = {"extract": 1, "transcribe": 2, "summarize": 3, "pdf": 4, "complete": 5}
+
+def iter_events(response):
+    """Parses the server-sent events of a streaming response into event dicts."""
+    data = []
+    for line in response.iter_lines():
+        decoded_line = line.decode("utf-8")
+        if decoded_line.startswith("data:"):
+            data.append(decoded_line[5:].strip())
+        elif not decoded_line and data:
+            yield json.loads("\n".join(data))
+            data = []
+
+def describe_progress(event):
+    """One-line status under the progress bar, e.g. audio decoded, chunk count and ETA."""
+    parts = [f"{event['percent']:.0f}%"]
+    if event.get("audio_total_seconds"):
+        parts.append(f"{event['audio_seconds']:.0f}s / {event['audio_total_seconds']:.0f}s of audio transcribed")
+    if event.get("chunk_index"):
+        total = f"/{event['chunk_total']}" if event.get("chunk_total") else ""
+        parts.append(f"chunk {event['chunks_done']}{total} summarized")
+    if event.get("eta_seconds") is not None:
+        parts.append(f"~{event['eta_seconds']:.0f}s left in this stage")
+    return " · ".join(parts)
+
 def process_file(uploaded_file, selected_font, selected_color, selected_language, css):
     """Handles file processing and UI updates in Streamlit with logging."""
 
@@ -49,40 +76,34 @@ def process_file(uploaded_file, selected_font, selected_color, selected_language
         response = requests.post(f"{API_URL}/upload/", files=files, data=payload, stream=True)
 
         filename = None
+        files = {}
+        downloads = {}
         if response.status_code == 200:
-            for line in response.iter_lines():
-                decoded_line = line.decode("utf-8").strip()
-
-                if "FILENAME::" in decoded_line:
-                    filename = decoded_line.replace("FILENAME::", "").strip()
+            progress_bar = st.progress(0)
+            progress_caption = st.empty()
+
+            for event in iter_events(response):
+                if event["type"] == "stage":
+                    logger.info(event["message"])
+                    st.session_state.progress = STAGE_STEPS[event["stage"]]
+                elif event["type"] == "complete":
+                    filename = event["filename"]
+                    files = event.get("files") or {selected_language: filename}
+                    downloads = event.get("downloads") or {language: f"/download/{name}" for language, name in files.items()}
                     logger.info(f"📄 Processed file available: {filename}")
-                    continue
-
-                # ✅ Update Stepper Progress
-                if "⏳" in decoded_line or "🔄" in decoded_line:
-                    logger.info("🔄 Extracting audio...")
-                    st.session_state.progress = 1
-                elif "📝" in decoded_line:
-                    logger.info("📝 Transcribing audio using Whisper AI...")
-                    st.session_state.progress = 2
-                elif "📑" in decoded_line:
-                    logger.info("📑 Summarizing transcript using GPT-4...")
-                    st.session_state.progress = 3
-                elif "📄" in decoded_line:
-                    logger.info("📄 Generating PDF output...")
-                    st.session_state.progress = 4
-                elif "✅" in decoded_line:
-                    logger.info("✅ Processing complete!")
-                    st.session_state.progress = 5
+                    st.session_state.progress = STAGE_STEPS["complete"]
+                elif event["type"] == "error":
+                    logger.error(f"❌ Processing failed: {event['error']}")
+                    break
+
+                progress_bar.progress(min(int(event["percent"]), 100))
+                progress_caption.caption(describe_progress(event))
 
                 # ✅ Update Stepper UI
                 stepper_html, _ = render_stepper(st.session_state.progress)
                 with stepper_container:
                     components.html(f"<style>{css}</style>{stepper_html}", height=height_needed)
 
-                time.sleep(1)
-
-
             # ✅ Final Step Update
             st.session_state.progress = step_count - 1
             stepper_html, _ = render_stepper(st.session_state.progress)
@@ -95,8 +116,7 @@ def process_file(uploaded_file, selected_font, selected_color, selected_language
 
             # ✅ Show Download Button
             if filename:
-                filename = filename.strip()
-                download_url = f"{API_URL}/download/{filename}"
+                download_urls = {language: f"{API_URL}{path}" for language, path in downloads.items()}
 
                 st.markdown("""
                 <style>
@@ -125,14 +145,17 @@ def process_file(uploaded_file, selected_font, selected_color, selected_language
                 </style>
                 """, unsafe_allow_html=True)
 
-                st.markdown(f"""
-                <div style="display: flex; justify-content: center; margin-top: 20px;">
-                    <a href="{download_url}" download="{filename}" target="_blank" class="styled-button">
-                        📥 Download PDF
-                    </a>
-                </div>
-                """, unsafe_allow_html=True)
-                logger.info(f"📥 Download link generated: {download_url}")
+                # ✅ One button per MoM language when several were requested
+                for language, download_url in download_urls.items():
+                    label = "📥 Download PDF" if len(download_urls) == 1 else f"📥 Download PDF ({language.upper()})"
+                    st.markdown(f"""
+                    <div style="display: flex; justify-content: center; margin-top: 20px;">
+                        <a href="{download_url}" download="{files[language]}" target="_blank" class="styled-button">
+                            {label}
+                        </a>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    logger.info(f"📥 Download link generated: {download_url}")
             else:
                 notification_placeholder.error("❌ Error retrieving the file!")
                 logger.error("❌ File retrieval failed!")
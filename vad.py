@@ -0,0 +1,83 @@
+import bisect
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def frame_energy_db(audio, frame_samples):
+    """Returns the RMS energy of consecutive frames in dBFS."""
+    frame_count = len(audio) // frame_samples
+    frames = audio[:frame_count * frame_samples].reshape(frame_count, frame_samples)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def silence_runs(voiced):
+    """Yields (start_frame, end_frame) for every run of unvoiced frames."""
+    start = None
+    for i, is_voiced in enumerate(voiced):
+        if not is_voiced and start is None:
+            start = i
+        elif is_voiced and start is not None:
+            yield start, i
+            start = None
+    if start is not None:
+        yield start, len(voiced)
+
+
+def split_on_silence(audio, sample_rate=SAMPLE_RATE, target_seconds=60.0, max_seconds=120.0,
+                     min_silence_ms=400, frame_ms=30, margin_db=8.0):
+    """
+    Splits audio into segments at silences found by an energy-based voice activity detector.
+
+    A frame counts as silence when its energy is within `margin_db` of the recording's noise
+    floor (its 5th percentile frame energy), capped halfway between the floor and speech level.
+    Segments are cut in the middle of the silence closest to `target_seconds`; if no silence
+    appears before `max_seconds` the segment is cut there.
+
+    Args:
+        audio (np.ndarray): Mono float32 samples.
+        sample_rate (int): Samples per second.
+        target_seconds (float): Preferred segment length.
+        max_seconds (float): Hard limit on segment length.
+        min_silence_ms (int): Shortest pause treated as a cut point.
+        frame_ms (int): Analysis frame length.
+        margin_db (float): Energy above the noise floor still treated as silence.
+
+    Returns:
+        list[tuple[int, int]]: (start_sample, end_sample) pairs covering the whole recording.
+    """
+    total = len(audio)
+    target = int(target_seconds * sample_rate)
+    limit = int(max_seconds * sample_rate)
+    frame_samples = int(sample_rate * frame_ms / 1000)
+    if total <= min(limit, target * 1.5) or total < frame_samples:
+        return [(0, total)]
+
+    energy = frame_energy_db(audio, frame_samples)
+    noise_floor, speech_level = np.percentile(energy, [5, 95])
+    threshold = min(noise_floor + margin_db, (noise_floor + speech_level) / 2)
+    min_silence_frames = max(1, int(min_silence_ms / frame_ms))
+
+    # ✅ Candidate cut points: the middle of every long-enough pause, in samples
+    cut_points = [
+        ((start + end) // 2) * frame_samples
+        for start, end in silence_runs(energy > threshold)
+        if end - start >= min_silence_frames
+    ]
+
+    segments = []
+    start = 0
+
+    # ✅ Stop splitting once the remainder is close to the target, so the last segment is not a sliver
+    while total - start > min(limit, target * 1.5):
+        low = bisect.bisect_right(cut_points, start)
+        high = bisect.bisect_right(cut_points, start + limit)
+        window = cut_points[low:high]
+        # ✅ Cut at the pause closest to the target length, or hard at the limit if there is none
+        end = min(window, key=lambda cut: abs(cut - start - target)) if window else start + limit
+        segments.append((start, end))
+        start = end
+
+    segments.append((start, total))
+    return segments
@@ -0,0 +1,70 @@
+import os
+import time
+import uuid
+import shutil
+from logger import logger
+
+# ✅ Root for per-job working directories and how long abandoned ones survive
+WORKSPACE_DIR = os.getenv("MOMIFY_WORKSPACE_DIR", os.path.join("uploads", "jobs"))
+WORKSPACE_TTL = int(os.getenv("MOMIFY_WORKSPACE_TTL", str(6 * 60 * 60)))
+
+
+class JobWorkspace:
+    """
+    An isolated working directory holding one job's upload and intermediate artifacts.
+
+    The directory starts as `pending-<token>` and is renamed to `<content hash>-<token>`
+    once the upload is stored, so artifacts are addressed by the input they came from
+    while two jobs with the same input still never share a directory.
+    """
+
+    def __init__(self, root, token, content_hash=None):
+        self.root = root
+        self.token = token
+        self.content_hash = content_hash
+
+    @classmethod
+    def create(cls):
+        token = uuid.uuid4().hex[:12]
+        root = os.path.join(WORKSPACE_DIR, f"pending-{token}")
+        os.makedirs(root, exist_ok=True)
+        return cls(root, token)
+
+    def path(self, name):
+        """Returns the path of an artifact inside this workspace."""
+        return os.path.join(self.root, name)
+
+    def seal(self, content_hash):
+        """Renames the workspace after the content hash of its input, once the input is complete."""
+        sealed_root = os.path.join(WORKSPACE_DIR, f"{content_hash[:16]}-{self.token}")
+        os.replace(self.root, sealed_root)
+        self.root = sealed_root
+        self.content_hash = content_hash
+
+    def cleanup(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        logger.info(f"🧹 Workspace removed: {self.root}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+
+
+def sweep_stale_workspaces(max_age=WORKSPACE_TTL):
+    """Removes workspaces left behind by crashed processes."""
+    if not os.path.isdir(WORKSPACE_DIR):
+        return 0
+
+    removed = 0
+    cutoff = time.time() - max_age
+    for name in os.listdir(WORKSPACE_DIR):
+        path = os.path.join(WORKSPACE_DIR, name)
+        if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+
+    if removed:
+        logger.info(f"🧹 Removed {removed} stale workspace(s) from {WORKSPACE_DIR}")
+    return removed